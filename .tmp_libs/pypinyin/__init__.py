@@ -24,7 +24,9 @@ from pypinyin.constants import (  # noqa
     STYLE_CYRILLIC_FIRST, CYRILLIC_FIRST
 )
 from pypinyin.core import (     # noqa
-    pinyin, lazy_pinyin, slug, load_single_dict, load_phrases_dict
+    pinyin, lazy_pinyin, slug, load_single_dict, load_phrases_dict,
+    load_dicts,
+    pinyin_batch, lazy_pinyin_batch
 )
 
 __title__ = 'pypinyin'
@@ -34,7 +36,8 @@ __license__ = 'MIT'
 __copyright__ = 'Copyright (c) 2016 mozillazg, 闲耘'
 __all__ = [
     'pinyin', 'lazy_pinyin', 'slug',
-    'load_single_dict', 'load_phrases_dict',
+    'load_single_dict', 'load_phrases_dict', 'load_dicts',
+    'pinyin_batch', 'lazy_pinyin_batch',
     'Style',
     'STYLE_NORMAL', 'NORMAL',
     'STYLE_TONE', 'TONE',
@@ -48,3 +48,6 @@ lazy_pinyin = core.lazy_pinyin
 slug = core.slug
 load_single_dict = core.load_single_dict
 load_phrases_dict = core.load_phrases_dict
+load_dicts = core.load_dicts
+pinyin_batch = core.pinyin_batch
+lazy_pinyin_batch = core.lazy_pinyin_batch
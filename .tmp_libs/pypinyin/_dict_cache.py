@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""拼音库的二进制缓存与延迟加载
+
+内置拼音库以 JSON 分发，解析 3MB 多的 JSON 需要上百毫秒。首次解析后把结果
+用 marshal 写到缓存文件，文件名包含 JSON 内容的哈希与解释器版本标记，JSON
+变化或换了解释器都会自动生成新的缓存。
+
+缓存目录默认是拼音库旁边的 ``__pycache__``，可以通过环境变量
+``PYPINYIN_DICT_CACHE_DIR`` 指定；设置 ``PYPINYIN_NO_DICT_CACHE`` 则不读写缓存。
+"""
+from __future__ import unicode_literals
+
+import gc
+import hashlib
+import marshal
+import os
+import sys
+import threading
+
+# 延迟加载的字典在多个线程首次使用时只能加载一次；
+# 副本的 loader 会加载原字典，所以用可重入锁
+_load_lock = threading.RLock()
+
+
+def _cache_path(json_path, digest, version=0):
+    cache_dir = os.environ.get('PYPINYIN_DICT_CACHE_DIR') or os.path.join(
+        os.path.dirname(json_path), '__pycache__')
+    tag = getattr(getattr(sys, 'implementation', None), 'cache_tag', None) or \
+        'py%d%d' % sys.version_info[:2]
+    name = os.path.splitext(os.path.basename(json_path))[0]
+    if version:
+        name = '{0}.v{1}'.format(name, version)
+    return os.path.join(cache_dir, '{0}.{1}.{2}.marshal'.format(
+        name, digest[:16], tag))
+
+
+def load_dict(json_path, parse, version=0):
+    """读取拼音库：优先读缓存，否则调用 ``parse(json_bytes)`` 解析并写入缓存
+
+    :param json_path: 拼音库 JSON 文件路径
+    :param parse: 把 JSON 文件内容 (bytes) 解析为字典等对象的函数，结果需能被 marshal 序列化
+    :param version: ``parse`` 结果的格式版本，格式变化时递增以免读到旧缓存
+    :return: 解析得到的对象
+    """
+    with open(json_path, 'rb') as fp:
+        data = fp.read()
+    if os.environ.get('PYPINYIN_NO_DICT_CACHE'):
+        return parse(data)
+
+    path = _cache_path(json_path, hashlib.sha256(data).hexdigest(), version)
+    # 大量小对象一次性创建，暂停循环垃圾回收避免反复触发全量扫描
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        try:
+            with open(path, 'rb') as fp:
+                return marshal.loads(fp.read())
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            pass
+
+        result = parse(data)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(tmp_path, 'wb') as fp:
+            marshal.dump(result, fp)
+        if hasattr(os, 'replace'):
+            os.replace(tmp_path, path)
+        else:  # pragma: no cover
+            os.rename(tmp_path, path)
+    except (IOError, OSError):
+        # 安装目录不可写时只是不缓存，不影响使用
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return result
+
+
+class _LoadedDict(dict):
+    """加载完成后的 LazyDict：不再覆盖任何方法，查找走 dict 的原生实现"""
+
+
+class LazyDict(dict):
+    """首次访问时才调用 ``loader()`` 填充内容的字典
+
+    加载完成后实例的类型切换为不覆盖任何方法的 dict 子类，之后的查找与
+    普通 dict 一样快。加载过程持有模块级的锁，多个线程同时首次访问时
+    只加载一次，其余线程等待加载完成。``copy()`` 返回的副本同样是延迟加载的。
+    """
+
+    def __init__(self, loader):
+        super(LazyDict, self).__init__()
+        self._loader = loader
+
+    def _load(self):
+        if type(self) is LazyDict:
+            with _load_lock:
+                # 等锁期间其他线程可能已经加载完成
+                if type(self) is LazyDict:
+                    dict.update(self, self._loader())
+                    del self._loader
+                    self.__class__ = _LoadedDict
+
+    def copy(self):
+        def loader():
+            self._load()
+            return dict.copy(self)
+        return LazyDict(loader)
+
+
+def _loading(name):
+    method = getattr(dict, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._load()
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = str(name)
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in (
+    '__contains__', '__delitem__', '__eq__', '__getitem__', '__iter__',
+    '__len__', '__ne__', '__repr__', '__setitem__',
+    'clear', 'get', 'items', 'keys', 'pop', 'popitem', 'setdefault',
+    'update', 'values', '__ior__', '__or__', '__reversed__',
+):
+    if hasattr(dict, _name):
+        setattr(LazyDict, _name, _loading(_name))
+del _name
@@ -0,0 +1,18 @@
+from typing import Any, Callable, Dict, TypeVar
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+
+def _cache_path(json_path: str, digest: str, version: int = ...) -> str: ...
+
+
+def load_dict(json_path: str, parse: Callable[[bytes], Any], version: int = ...) -> Any: ...
+
+
+class LazyDict(Dict[K, V]):
+    def __init__(self, loader: Callable[[], Dict[K, V]]) -> None: ...
+
+    def _load(self) -> None: ...
+
+    def copy(self) -> LazyDict[K, V]: ...
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""紧凑的单字拼音库
+
+内置单字拼音库有四万多个汉字，用 ``{码位: "拼音1,拼音2"}`` 的 dict 保存时
+每个条目都要一个 int 对象、一个字符串对象和一个哈希表槽位，查找时还要
+``split(',')`` 生成新列表。
+
+这里按码位分页保存：每页 256 个码位，页内是一个条目编号数组 (array)，
+没有汉字的页不占空间。所有汉字共用几千种不同的读音组合，每种组合只
+生成一次拼音元组，元组里的拼音字符串也都是同一份对象，查找时直接返回，
+不再做任何分割和复制。
+
+:class:`PinyinTable` 实现了 dict 的读写接口，``PINYIN_DICT[num]`` 仍返回逗号
+分隔的字符串。修改过的条目单独保存在一个小 dict 里，优先于内置数据。
+"""
+from __future__ import unicode_literals
+
+import threading
+from array import array
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:  # pragma: no cover
+    from collections import MutableMapping
+
+_PAGE_BITS = 8
+_PAGE_SIZE = 1 << _PAGE_BITS
+_PAGE_MASK = _PAGE_SIZE - 1
+
+# 副本的 loader 是原表的 _base，所以用可重入锁
+_load_lock = threading.RLock()
+
+
+def pack_pinyin_dict(pinyin_dict):
+    """把 ``{码位: "拼音1,拼音2"}`` 打包为可以被 marshal 序列化的紧凑格式
+
+    :return: ``(syllables, offsets, ids, pages)``。``syllables`` 是所有不同的拼音；
+             第 i 种读音组合是 ``ids[offsets[i]:offsets[i + 1]]`` 这些拼音编号，
+             编号 0 表示没有拼音；``pages`` 是 ``(页号, 该页 256 个码位的组合编号)``
+    """
+    syllable_ids = {}
+    entry_ids = {}
+    offsets = [0, 0]
+    ids = []
+    pages = {}
+    for num in sorted(pinyin_dict):
+        value = pinyin_dict[num]
+        eid = entry_ids.get(value)
+        if eid is None:
+            eid = entry_ids[value] = len(offsets) - 1
+            for py in value.split(','):
+                ids.append(syllable_ids.setdefault(py, len(syllable_ids)))
+            offsets.append(len(ids))
+        page = pages.get(num >> _PAGE_BITS)
+        if page is None:
+            page = pages[num >> _PAGE_BITS] = [0] * _PAGE_SIZE
+        page[num & _PAGE_MASK] = eid
+
+    syllables = sorted(syllable_ids, key=syllable_ids.get)
+    return (
+        tuple(syllables), tuple(offsets), tuple(ids),
+        tuple((n, tuple(pages[n])) for n in sorted(pages)),
+    )
+
+
+def unpack_pinyin_dict(packed):
+    """把 :func:`pack_pinyin_dict` 的结果还原为 ``(entries, pages, size)``
+
+    ``entries[i]`` 是第 i 种读音组合的拼音元组 (``entries[0]`` 为 ``None``)，
+    ``pages[页号]`` 是该页的组合编号数组，没有汉字的页为 ``None``。
+    """
+    syllables, offsets, ids, packed_pages = packed
+    entries = [None]
+    for i in range(1, len(offsets) - 1):
+        entries.append(tuple(
+            syllables[sid] for sid in ids[offsets[i]:offsets[i + 1]]))
+
+    typecode = 'H' if len(entries) <= 0xffff else 'I'
+    pages = [None] * (packed_pages[-1][0] + 1 if packed_pages else 0)
+    size = 0
+    for n, page in packed_pages:
+        pages[n] = array(typecode, page)
+        size += _PAGE_SIZE - page.count(0)
+    return entries, pages, size
+
+
+class PinyinTable(MutableMapping):
+    """以码位为键、逗号分隔的拼音字符串为值的单字拼音库
+
+    内置数据在首次访问时才调用 ``loader()`` 加载 (多线程同时首次访问时
+    只加载一次)，``loader`` 返回 :func:`unpack_pinyin_dict` 的结果。查找请使用 :meth:`pinyins`。
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._entries = None
+        self._pages = None
+        self._size = 0
+        # 修改过的条目: {码位: 拼音元组}，值为 None 表示已删除
+        self._extra = {}
+
+    def _base(self):
+        if self._pages is None:
+            with _load_lock:
+                # 等锁期间其他线程可能已经加载完成
+                if self._pages is None:
+                    entries, pages, size = self._loader()
+                    self._entries, self._size = entries, size
+                    # 最后设置 _pages：pinyins() 不加锁，只凭它判断是否已加载
+                    self._pages = pages
+                    self._loader = None
+        return self._entries, self._pages, self._size
+
+    def _base_pinyins(self, num):
+        pages = self._pages
+        if pages is None:
+            pages = self._base()[1]
+        page = num >> _PAGE_BITS
+        if page < len(pages):
+            table = pages[page]
+            if table is not None:
+                return self._entries[table[num & _PAGE_MASK]]
+        return None
+
+    def pinyins(self, num):
+        """返回码位 ``num`` 对应汉字的拼音元组，没有拼音时返回 ``None``
+
+        返回的元组是共用的，不会为每次调用生成新对象。
+        """
+        extra = self._extra
+        if extra and num in extra:
+            return extra[num]
+        try:
+            return self._entries[self._pages[num >> _PAGE_BITS][num & _PAGE_MASK]]
+        except (IndexError, TypeError):
+            # 超出范围、空页或者尚未加载
+            return self._base_pinyins(num)
+
+    def __getitem__(self, num):
+        try:
+            pys = self.pinyins(num)
+        except TypeError:
+            pys = None
+        if pys is None:
+            raise KeyError(num)
+        return ','.join(pys)
+
+    def __setitem__(self, num, value):
+        self._extra[num] = tuple(value.split(','))
+
+    def __delitem__(self, num):
+        if num not in self:
+            raise KeyError(num)
+        self._extra[num] = None
+
+    def __contains__(self, num):
+        try:
+            return self.pinyins(num) is not None
+        except TypeError:
+            return False
+
+    def __iter__(self):
+        _, pages, _ = self._base()
+        extra = self._extra
+        for n, table in enumerate(pages):
+            if table is None:
+                continue
+            start = n << _PAGE_BITS
+            for i, eid in enumerate(table):
+                if eid and (start + i) not in extra:
+                    yield start + i
+        for num, pys in list(extra.items()):
+            if pys is not None:
+                yield num
+
+    def __len__(self):
+        size = self._base()[2]
+        for num, pys in self._extra.items():
+            try:
+                in_base = self._base_pinyins(num) is not None
+            except TypeError:
+                in_base = False
+            size += (pys is not None) - in_base
+        return size
+
+    def __repr__(self):
+        return '{0}({1} items)'.format(type(self).__name__, len(self))
+
+    def copy(self):
+        """返回副本：内置数据共用，修改过的条目各自独立"""
+        other = type(self)(self._base)
+        other._extra = self._extra.copy()
+        return other
@@ -0,0 +1,35 @@
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, MutableMapping, Optional, Text, Tuple
+
+_Packed = Tuple[Tuple[Text, ...], Tuple[int, ...], Tuple[int, ...], Tuple[Tuple[int, Tuple[int, ...]], ...]]
+_Unpacked = Tuple[List[Optional[Tuple[Text, ...]]], List[Optional[array]], int]
+
+
+def pack_pinyin_dict(pinyin_dict: Dict[int, Text]) -> _Packed: ...
+
+
+def unpack_pinyin_dict(packed: _Packed) -> _Unpacked: ...
+
+
+class PinyinTable(MutableMapping[int, Text]):
+    def __init__(self, loader: Callable[[], _Unpacked]) -> None: ...
+
+    def _base(self) -> _Unpacked: ...
+
+    def _base_pinyins(self, num: int) -> Optional[Tuple[Text, ...]]: ...
+
+    def pinyins(self, num: int) -> Optional[Tuple[Text, ...]]: ...
+
+    def __getitem__(self, num: int) -> Text: ...
+
+    def __setitem__(self, num: int, value: Text) -> None: ...
+
+    def __delitem__(self, num: int) -> None: ...
+
+    def __contains__(self, num: Any) -> bool: ...
+
+    def __iter__(self) -> Iterator[int]: ...
+
+    def __len__(self) -> int: ...
+
+    def copy(self) -> PinyinTable: ...
@@ -1,9 +1,11 @@
 from enum import IntEnum, unique
 from typing import Dict, List, Any, Text
 
+from pypinyin._pinyin_table import PinyinTable
+
 PHRASES_DICT = ...  # type: Dict[Text, List[List[Text]]]
 
-PINYIN_DICT = ...  # type: Dict[int, Text]
+PINYIN_DICT = ...  # type: PinyinTable
 
 RE_TONE2 = ...  # type: Any
 
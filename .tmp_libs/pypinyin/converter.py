@@ -2,7 +2,8 @@
 
 from __future__ import unicode_literals
 
-from copy import deepcopy
+from collections import OrderedDict, namedtuple
+from weakref import WeakSet
 
 from pypinyin.compat import text_type, callable_check
 from pypinyin.constants import (
@@ -19,6 +20,43 @@ from pypinyin.style import convert as convert_style
 
 auto_discover()
 
+#: 转换结果缓存的统计信息
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# 启用了结果缓存的转换器，拼音库变化时统一清空
+_cached_converters = WeakSet()
+
+
+# 类 -> post_pinyin 与 convert_styles 是否都是 pypinyin 自带的实现
+_builtin_hooks_cache = {}
+
+
+def _builtin_hooks(cls):
+    """``cls`` 的 ``post_pinyin`` 与 ``convert_styles`` 是否都是 pypinyin 自带的实现
+
+    自带的实现只会生成新列表，不会原地修改与拼音库共用的拼音列表。
+    """
+    try:
+        return _builtin_hooks_cache[cls]
+    except KeyError:
+        pass
+    builtin = all(
+        getattr(getattr(cls, name), '__module__', '').startswith('pypinyin.')
+        for name in ('post_pinyin', 'convert_styles')
+    )
+    _builtin_hooks_cache[cls] = builtin
+    return builtin
+
+
+def clear_caches():
+    """清空所有转换器的转换结果缓存。
+
+    :py:func:`~pypinyin.load_single_dict` 和
+    :py:func:`~pypinyin.load_phrases_dict` 修改拼音库后会自动调用。
+    """
+    for converter in list(_cached_converters):
+        converter.cache_clear()
+
 
 class Converter(object):
 
@@ -28,12 +66,46 @@ class Converter(object):
 
 
 class DefaultConverter(Converter):
-    def __init__(self, **kwargs):
-        pass
+    # 子类的 __init__ 不调用 super().__init__() 时按不缓存处理；
+    # _cache_size 为 0 时不会写入这个共用的空缓存
+    _cache_size = 0
+    _cache = OrderedDict()
+    _cache_hits = 0
+    _cache_misses = 0
+
+    def __init__(self, cache_size=None, **kwargs):
+        """
+        :param cache_size: 大于 0 时缓存最近 ``cache_size`` 个词语的转换结果
+                           (LRU)。结果只取决于词语和转换参数，真实文本中
+                           高频词占多数，大部分转换可以直接命中缓存
+        :type cache_size: int
+        """
+        self._cache_size = cache_size or 0
+        self._cache = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        if self._cache_size > 0:
+            _cached_converters.add(self)
+
+    def cache_info(self):
+        """返回转换结果缓存的命中次数、未命中次数、容量与当前大小
+
+        :rtype: CacheInfo
+        """
+        return CacheInfo(self._cache_hits, self._cache_misses,
+                         self._cache_size, len(self._cache))
+
+    def cache_clear(self):
+        """清空转换结果缓存与统计信息"""
+        self._cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def convert(self, words, style, heteronym, errors, strict, **kwargs):
         """根据参数把汉字转成相应风格的拼音结果。
 
+        启用了缓存 (``cache_size``) 时相同参数的重复转换直接返回缓存结果的副本。
+
         :param words: 汉字字符串
         :type words: unicode
         :param style: 拼音风格
@@ -48,11 +120,36 @@ class DefaultConverter(Converter):
         :rtype: list
 
         """
+        if self._cache_size <= 0:
+            return self._convert(words, style, heteronym, errors, strict)
+
+        key = (words, style, heteronym, errors, strict)
+        cache = self._cache
+        try:
+            pys = cache.pop(key)
+        except KeyError:
+            self._cache_misses += 1
+            pys = self._convert(words, style, heteronym, errors, strict)
+            if len(cache) >= self._cache_size:
+                cache.popitem(last=False)
+        except TypeError:  # errors 是不可哈希的对象，不缓存
+            return self._convert(words, style, heteronym, errors, strict)
+        else:
+            self._cache_hits += 1
+        cache[key] = pys
+        # 结果列表可能被调用方修改，不能与缓存共用
+        return [list(item) for item in pys]
+
+    def _convert(self, words, style, heteronym, errors, strict):
         pys = []
         # 初步过滤没有拼音的字符
         if RE_HANS.match(words):
             pys = self._phrase_pinyin(words, style=style, heteronym=heteronym,
                                       errors=errors, strict=strict)
+            if not _builtin_hooks(type(self)):
+                # 自定义的钩子可能原地修改拼音列表，交给它的是独立的副本，
+                # 避免改动拼音库
+                pys = [list(item) for item in pys]
             post_data = self.post_pinyin(words, heteronym, pys)
             if post_data is not None:
                 pys = post_data
@@ -248,12 +345,15 @@ class DefaultConverter(Converter):
         :param strict: 只获取声母或只获取韵母相关拼音风格的返回结果
                        是否严格遵照《汉语拼音方案》来处理声母和韵母，
                        详见 :ref:`strict`
-        :return: 拼音列表
+        :return: 拼音列表。词典中的词语只复制外层列表，每个字的拼音列表
+                 与词典共用，后续处理需要生成新列表而不是原地修改。
+                 子类自定义了 ``post_pinyin`` 或 ``convert_styles`` 时，
+                 ``_convert`` 会先复制一份再交给它们
         :rtype: list
         """
         pinyin_list = []
         if phrase in PHRASES_DICT:
-            pinyin_list = deepcopy(PHRASES_DICT[phrase])
+            pinyin_list = list(PHRASES_DICT[phrase])
         else:
             for han in phrase:
                 py = self._single_pinyin(han, style, heteronym, errors, strict)
@@ -290,17 +390,18 @@ class DefaultConverter(Converter):
         :param strict: 只获取声母或只获取韵母相关拼音风格的返回结果
                        是否严格遵照《汉语拼音方案》来处理声母和韵母，
                        详见 :ref:`strict`
-        :return: 返回拼音列表，多音字会有多个拼音项
+        :return: 返回拼音列表，多音字会有多个拼音项。字的拼音是拼音库中
+                 共用的元组，后续处理需要生成新列表；子类自定义的
+                 ``post_pinyin`` / ``convert_styles`` 收到的仍是列表副本
         :rtype: list
         """
-        num = ord(han)
+        pys = PINYIN_DICT.pinyins(ord(han))  # 字的拼音元组
         # 处理没有拼音的字符
-        if num not in PINYIN_DICT:
+        if pys is None:
             return self.handle_nopinyin(
                 han, style=style, errors=errors,
                 heteronym=heteronym, strict=strict)
 
-        pys = PINYIN_DICT[num].split(',')  # 字的拼音列表
         return [pys]
 
     def _convert_style(self, han, pinyin, style, strict, default,
@@ -343,6 +444,12 @@ class _toneSandhiConverter(ToneSandhiMixin, DefaultConverter):
     pass
 
 
+# UltimateConverter 每转换一个拼音都要用到，共用实例而不是每次新建
+_v2u_converter = _v2UConverter()
+_neutral_tone_with_5_converter = _neutralToneWith5Converter()
+_tone_sandhi_converter = _toneSandhiConverter()
+
+
 class UltimateConverter(DefaultConverter):
     def __init__(self, v_to_u=False, neutral_tone_with_five=False,
                  tone_sandhi=False, **kwargs):
@@ -359,13 +466,13 @@ class UltimateConverter(DefaultConverter):
             converted_pinyin = post_data
 
         if self._v_to_u:
-            post_data = _v2UConverter().post_convert_style(
+            post_data = _v2u_converter.post_convert_style(
                 han, orig_pinyin, converted_pinyin, style, strict, **kwargs)
             if post_data is not None:
                 converted_pinyin = post_data
 
         if self._neutral_tone_with_five:
-            post_data = _neutralToneWith5Converter().post_convert_style(
+            post_data = _neutral_tone_with_5_converter.post_convert_style(
                 han, orig_pinyin, converted_pinyin, style, strict, **kwargs)
             if post_data is not None:
                 converted_pinyin = post_data
@@ -379,7 +486,7 @@ class UltimateConverter(DefaultConverter):
             pinyin = post_data
 
         if self._tone_sandhi:
-            post_data = _toneSandhiConverter().post_pinyin(
+            post_data = _tone_sandhi_converter.post_pinyin(
                 han, heteronym, pinyin, **kwargs)
             if post_data is not None:
                 pinyin = post_data
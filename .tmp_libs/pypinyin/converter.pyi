@@ -1,5 +1,6 @@
 from typing import Any
 from typing import List
+from typing import NamedTuple
 from typing import Union
 from typing import Callable
 from typing import Optional
@@ -21,13 +22,33 @@ class Converter(object):
                 **kwargs: Any) -> TPinyinResult: ...
 
 
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def _builtin_hooks(cls: type) -> bool: ...
+
+
+def clear_caches() -> None: ...
+
+
 class DefaultConverter(Converter):
-    def __init__(self, **kwargs: Any) -> None: ...
+    def __init__(self, cache_size: Optional[int] = ..., **kwargs: Any) -> None: ...
+
+    def cache_info(self) -> CacheInfo: ...
+
+    def cache_clear(self) -> None: ...
 
     def convert(self, words: Text, style: TStyle, heteronym: bool,
                 errors: TErrors, strict: bool = ...,
                 **kwargs: Any) -> TPinyinResult: ...
 
+    def _convert(self, words: Text, style: TStyle, heteronym: bool,
+                 errors: TErrors, strict: bool) -> TPinyinResult: ...
+
     def pre_convert_style(self, han: Text, orig_pinyin: Text, style: TStyle,
                           strict: bool, **kwargs: Any) -> Optional[Text]: ...
 
@@ -3,13 +3,17 @@
 
 from __future__ import unicode_literals
 
-from itertools import chain
+from collections import deque
+from itertools import chain, islice
+from multiprocessing import Pool
 
 from pypinyin.compat import text_type
 from pypinyin.constants import (
     PHRASES_DICT, PINYIN_DICT, Style, RE_HANS
 )
-from pypinyin.converter import DefaultConverter, UltimateConverter
+from pypinyin.converter import (
+    DefaultConverter, UltimateConverter, clear_caches
+)
 from pypinyin.contrib.tone_sandhi import ToneSandhiMixin
 from pypinyin.contrib.tone_convert import tone2_to_tone
 from pypinyin.seg import mmseg
@@ -23,14 +27,7 @@ def load_single_dict(pinyin_dict, style='default'):
     :param style: pinyin_dict 参数值的拼音库风格. 支持 'default', 'tone2'
     :type pinyin_dict: dict
     """
-    if style == 'tone2':
-        for k, v in pinyin_dict.items():
-            v = tone2_to_tone(v)
-            PINYIN_DICT[k] = v
-    else:
-        PINYIN_DICT.update(pinyin_dict)
-
-    mmseg.retrain(mmseg.seg)
+    load_dicts(pinyin_dicts=[pinyin_dict], style=style)
 
 
 def load_phrases_dict(phrases_dict, style='default'):
@@ -40,17 +37,47 @@ def load_phrases_dict(phrases_dict, style='default'):
     :param style: phrases_dict 参数值的拼音库风格. 支持 'default', 'tone2'
     :type phrases_dict: dict
     """
-    if style == 'tone2':
-        for k, value in phrases_dict.items():
-            v = [
-                list(map(tone2_to_tone, pys))
-                for pys in value
-            ]
-            PHRASES_DICT[k] = v
-    else:
-        PHRASES_DICT.update(phrases_dict)
+    load_dicts(phrases_dicts=[phrases_dict], style=style)
+
+
+def load_dicts(pinyin_dicts=(), phrases_dicts=(), style='default'):
+    """一次载入多个用户自定义的单字拼音库和词语拼音库
+
+    分词器只补充训练新增的词语，全部载入后才更新一次分词索引、清空一次
+    转换缓存，分多批载入大量词语时比逐个调用
+    :py:func:`~pypinyin.load_phrases_dict` 快得多。
+
+    :param pinyin_dicts: 单字拼音库列表，格式同
+                         :py:func:`~pypinyin.load_single_dict`
+    :param phrases_dicts: 词语拼音库列表，格式同
+                          :py:func:`~pypinyin.load_phrases_dict`
+    :param style: 拼音库的风格. 支持 'default', 'tone2'
+    """
+    for pinyin_dict in pinyin_dicts:
+        if style == 'tone2':
+            for k, v in pinyin_dict.items():
+                v = tone2_to_tone(v)
+                PINYIN_DICT[k] = v
+        else:
+            PINYIN_DICT.update(pinyin_dict)
+
+    new_phrases = []
+    for phrases_dict in phrases_dicts:
+        if style == 'tone2':
+            for k, value in phrases_dict.items():
+                v = [
+                    list(map(tone2_to_tone, pys))
+                    for pys in value
+                ]
+                PHRASES_DICT[k] = v
+        else:
+            PHRASES_DICT.update(phrases_dict)
+        new_phrases.extend(phrases_dict)
 
-    mmseg.retrain(mmseg.seg)
+    # 单字拼音库不影响分词，只有新增词语时才需要训练
+    if new_phrases:
+        mmseg.retrain(mmseg.seg, new_phrases)
+    clear_caches()
 
 
 class Pinyin(object):
@@ -86,28 +113,28 @@ class Pinyin(object):
         :rtype: list
 
         """
-        # 对字符串进行分词处理
-        if isinstance(hans, text_type):
-            han_list = self.seg(hans)
-        else:
-            if isinstance(self._converter, UltimateConverter) or \
-                    isinstance(self._converter, ToneSandhiMixin):
-                han_list = []
-                for h in hans:
-                    if not RE_HANS.match(h):
-                        han_list.extend(self.seg(h))
-                    else:
-                        han_list.append(h)
-            else:
-                han_list = chain(*(self.seg(x) for x in hans))
-
         pys = []
-        for words in han_list:
+        for words in self._seg_hans(hans):
             pys.extend(
                 self._converter.convert(
                     words, style, heteronym, errors, strict=strict))
         return pys
 
+    def _seg_hans(self, hans):
+        """对字符串或已分词的字符串列表进行分词处理"""
+        if isinstance(hans, text_type):
+            return self.seg(hans)
+        if isinstance(self._converter, UltimateConverter) or \
+                isinstance(self._converter, ToneSandhiMixin):
+            han_list = []
+            for h in hans:
+                if not RE_HANS.match(h):
+                    han_list.extend(self.seg(h))
+                else:
+                    han_list.append(h)
+            return han_list
+        return chain(*(self.seg(x) for x in hans))
+
     def lazy_pinyin(self, hans, style=Style.NORMAL,
                     errors='default', strict=True, **kwargs):
         """将汉字转换为拼音，返回不包含多音字结果的拼音列表.
@@ -136,6 +163,59 @@ class Pinyin(object):
                     hans, style=style, heteronym=False,
                     errors=errors, strict=strict)))
 
+    def pinyin_batch(self, docs, style=Style.TONE, heteronym=False,
+                     errors='default', strict=True, jobs=1, chunksize=1000,
+                     **kwargs):
+        """批量转换多个文档，按输入顺序逐个产出每个文档的 :py:meth:`pinyin` 结果。
+
+        同一批文档中重复出现的词语只转换一次。
+
+        :param docs: 文档的可迭代对象，每个文档是 :py:meth:`pinyin` 的 ``hans`` 参数
+        :param jobs: 大于 1 时把文档按 ``chunksize`` 个一组分给 ``jobs`` 个进程
+                     转换，要求当前实例可以被 pickle
+        :param chunksize: 进程池模式下每组的文档数
+        :return: 结果迭代器，其余参数与 :py:meth:`pinyin` 相同
+        """
+        options = dict(style=style, heteronym=heteronym, errors=errors,
+                       strict=strict)
+        if jobs > 1:
+            return _pool_batch(self, 'pinyin_batch', docs, options,
+                               jobs, chunksize)
+        return self._iter_batch(docs, options, lazy=False)
+
+    def lazy_pinyin_batch(self, docs, style=Style.NORMAL, errors='default',
+                          strict=True, jobs=1, chunksize=1000, **kwargs):
+        """批量转换多个文档，按输入顺序逐个产出每个文档的
+        :py:meth:`lazy_pinyin` 结果。参数详见 :py:meth:`pinyin_batch`
+        """
+        options = dict(style=style, errors=errors, strict=strict)
+        if jobs > 1:
+            return _pool_batch(self, 'lazy_pinyin_batch', docs, options,
+                               jobs, chunksize)
+        options['heteronym'] = False
+        return self._iter_batch(docs, options, lazy=True)
+
+    def _iter_batch(self, docs, options, lazy, cache=None):
+        convert = self._converter.convert
+        # 词语 -> 转换结果。默认只在本批次内共享，以 _BATCH_CACHE_SIZE 为上限
+        if cache is None:
+            cache = {}
+        for hans in docs:
+            pys = []
+            for words in self._seg_hans(hans):
+                result = cache.get(words)
+                if result is None:
+                    result = convert(words, **options)
+                    if len(cache) < _BATCH_CACHE_SIZE:
+                        cache[words] = result
+                if lazy:
+                    for item in result:
+                        pys.append(item[0])
+                else:
+                    # 结果列表可能被调用方修改，不能与缓存共用
+                    pys.extend(list(item) for item in result)
+            yield pys
+
     def pre_seg(self, hans, **kwargs):
         """对字符串进行分词前将调用 ``pre_seg`` 方法对未分词的字符串做预处理。
 
@@ -195,6 +275,54 @@ class Pinyin(object):
 _default_convert = DefaultConverter()
 _default_pinyin = Pinyin(_default_convert)
 
+# 批量转换时每批最多缓存的词语数
+_BATCH_CACHE_SIZE = 100000
+
+# 进程池中转换批量文档的 Pinyin 实例，以及跨文档组共享的词语缓存
+_batch_instance = None
+_batch_caches = {}
+
+
+def _init_batch_worker(instance):
+    global _batch_instance
+    _batch_instance = instance
+    _batch_caches.clear()
+
+
+def _convert_batch_chunk(args):
+    method, docs, options = args
+    lazy = method == 'lazy_pinyin_batch'
+    if lazy:
+        options = dict(options, heteronym=False)
+    cache = _batch_caches.setdefault(
+        (lazy, tuple(sorted(options.items()))), {})
+    return list(_batch_instance._iter_batch(docs, options, lazy, cache))
+
+
+def _pool_batch(instance, method, docs, options, jobs, chunksize):
+    """按 chunksize 个文档一组交给进程池转换，按输入顺序产出结果
+
+    最多同时有 2 * jobs 组在转换，输入再大也不会整体读入内存。
+    """
+    docs = iter(docs)
+    chunks = iter(lambda: list(islice(docs, chunksize)), [])
+    pool = Pool(jobs, initializer=_init_batch_worker, initargs=(instance,))
+    try:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(
+                _convert_batch_chunk, ((method, chunk, options),)))
+            if len(pending) >= 2 * jobs:
+                for pys in pending.popleft().get():
+                    yield pys
+        while pending:
+            for pys in pending.popleft().get():
+                yield pys
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
 
 def to_fixed(pinyin, style, strict=True):
     # 用于向后兼容，TODO: 废弃
@@ -213,14 +341,14 @@ def handle_nopinyin(chars, errors='default', heteronym=True):
 
 def single_pinyin(han, style, heteronym, errors='default', strict=True):
     # 用于向后兼容，TODO: 废弃
-    return _default_convert._single_pinyin(
-        han, style, heteronym, errors=errors, strict=strict)
+    return [list(pys) for pys in _default_convert._single_pinyin(
+        han, style, heteronym, errors=errors, strict=strict)]
 
 
 def phrase_pinyin(phrase, style, heteronym, errors='default', strict=True):
     # 用于向后兼容，TODO: 废弃
-    return _default_convert._phrase_pinyin(
-        phrase, style, heteronym, errors=errors, strict=strict)
+    return [list(pys) for pys in _default_convert._phrase_pinyin(
+        phrase, style, heteronym, errors=errors, strict=strict)]
 
 
 def pinyin(hans, style=Style.TONE, heteronym=False,
@@ -386,3 +514,50 @@ def lazy_pinyin(hans, style=Style.NORMAL, errors='default', strict=True,
         tone_sandhi=tone_sandhi))
     return _pinyin.lazy_pinyin(
         hans, style=style, errors=errors, strict=strict)
+
+
+def pinyin_batch(docs, style=Style.TONE, heteronym=False, errors='default',
+                 strict=True, v_to_u=False, neutral_tone_with_five=False,
+                 jobs=1, chunksize=1000):
+    """批量将多个文档转换为拼音，按输入顺序逐个产出每个文档的
+    :py:func:`~pypinyin.pinyin` 结果。
+
+    同一批文档中重复出现的词语只转换一次，适合逐行转换大量文本。
+
+    :param docs: 文档的可迭代对象，每个文档是 :py:func:`~pypinyin.pinyin`
+                 的 ``hans`` 参数
+    :param jobs: 大于 1 时使用 ``jobs`` 个进程并行转换
+    :param chunksize: 并行转换时每个进程每次处理的文档数
+    :return: 结果迭代器，其余参数详见 :py:func:`~pypinyin.pinyin`
+
+    Usage::
+
+      >>> from pypinyin import pinyin_batch
+      >>> list(pinyin_batch(['中心', '中国']))
+      [[['zhōng'], ['xīn']], [['zhōng'], ['guó']]]
+    """
+    _pinyin = Pinyin(UltimateConverter(
+        v_to_u=v_to_u, neutral_tone_with_five=neutral_tone_with_five))
+    return _pinyin.pinyin_batch(
+        docs, style=style, heteronym=heteronym, errors=errors, strict=strict,
+        jobs=jobs, chunksize=chunksize)
+
+
+def lazy_pinyin_batch(docs, style=Style.NORMAL, errors='default', strict=True,
+                      v_to_u=False, neutral_tone_with_five=False,
+                      tone_sandhi=False, jobs=1, chunksize=1000):
+    """批量将多个文档转换为拼音，按输入顺序逐个产出每个文档的
+    :py:func:`~pypinyin.lazy_pinyin` 结果。参数详见 :py:func:`~pypinyin.pinyin_batch`
+
+    Usage::
+
+      >>> from pypinyin import lazy_pinyin_batch
+      >>> list(lazy_pinyin_batch(['中心', '中国']))
+      [['zhong', 'xin'], ['zhong', 'guo']]
+    """
+    _pinyin = Pinyin(UltimateConverter(
+        v_to_u=v_to_u, neutral_tone_with_five=neutral_tone_with_five,
+        tone_sandhi=tone_sandhi))
+    return _pinyin.lazy_pinyin_batch(
+        docs, style=style, errors=errors, strict=strict,
+        jobs=jobs, chunksize=chunksize)
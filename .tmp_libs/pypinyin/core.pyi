@@ -1,4 +1,6 @@
 from typing import Any
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Dict
 from typing import Union
@@ -24,6 +26,11 @@ def load_phrases_dict(phrases_dict: Dict[Text, List[List[Text]]],
                       ) -> None: ...
 
 
+def load_dicts(pinyin_dicts: Iterable[Dict[int, Text]] = ...,
+               phrases_dicts: Iterable[Dict[Text, List[List[Text]]]] = ...,
+               style: str = ...) -> None: ...
+
+
 def to_fixed(pinyin: Text, style: TStyle,
              strict: bool = ...) -> Text: ...
 
@@ -87,6 +94,30 @@ def lazy_pinyin(hans: Union[List[Text], Text],
                 ) -> List[Text]: ...
 
 
+def pinyin_batch(docs: Iterable[Union[List[Text], Text]],
+                 style: TStyle = ...,
+                 heteronym: bool = ...,
+                 errors: TErrors = ...,
+                 strict: bool = ...,
+                 v_to_u: bool = ...,
+                 neutral_tone_with_five: bool = ...,
+                 jobs: int = ...,
+                 chunksize: int = ...
+                 ) -> Iterator[List[List[Text]]]: ...
+
+
+def lazy_pinyin_batch(docs: Iterable[Union[List[Text], Text]],
+                      style: TStyle = ...,
+                      errors: TErrors = ...,
+                      strict: bool = ...,
+                      v_to_u: bool = ...,
+                      neutral_tone_with_five: bool = ...,
+                      tone_sandhi: bool = ...,
+                      jobs: int = ...,
+                      chunksize: int = ...
+                      ) -> Iterator[List[Text]]: ...
+
+
 class Pinyin(object):
 
     def __init__(self, converter: Converter = ..., **kwargs: Any) -> None:
@@ -107,6 +138,25 @@ class Pinyin(object):
                     **kwargs: Any
                     ) -> List[Text]: ...
 
+    def pinyin_batch(self, docs: Iterable[Union[List[Text], Text]],
+                     style: TStyle = ...,
+                     heteronym: bool = ...,
+                     errors: TErrors = ...,
+                     strict: bool = ...,
+                     jobs: int = ...,
+                     chunksize: int = ...,
+                     **kwargs: Any
+                     ) -> Iterator[TPinyinResult]: ...
+
+    def lazy_pinyin_batch(self, docs: Iterable[Union[List[Text], Text]],
+                          style: TStyle = ...,
+                          errors: TErrors = ...,
+                          strict: bool = ...,
+                          jobs: int = ...,
+                          chunksize: int = ...,
+                          **kwargs: Any
+                          ) -> Iterator[List[Text]]: ...
+
     def pre_seg(self, hans: Text,
                 **kwargs: Any) -> Optional[List[Text]]: ...
 
@@ -1,20 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from codecs import open
 import json
 import os
 
+from pypinyin._dict_cache import LazyDict, load_dict
+
 _current_dir = os.path.dirname(os.path.realpath(__file__))
 _json_path = os.path.join(_current_dir, 'phrases_dict.json')
 
-phrases_dict = {}
+
+def _parse_phrases_dict(data):
+    phrases_dict = json.loads(data.decode('utf8'))
+    # 同一个拼音只保留一个字符串对象，缓存文件与内存都更小
+    syllables = {}
+    for k, value in phrases_dict.items():
+        phrases_dict[k] = [[syllables.setdefault(py, py) for py in pys]
+                           for pys in value]
+    return phrases_dict
 
 
 def _load_phrases_dict():
-    global phrases_dict
-    with open(_json_path, encoding='utf8') as fp:
-        phrases_dict = json.loads(fp.read())
+    return load_dict(_json_path, _parse_phrases_dict)
 
 
-_load_phrases_dict()
+# 首次访问时才读取 (优先读二进制缓存)
+phrases_dict = LazyDict(_load_phrases_dict)
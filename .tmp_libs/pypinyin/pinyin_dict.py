@@ -1,22 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from codecs import open
 import json
 import os
 
+from pypinyin._dict_cache import load_dict
+from pypinyin._pinyin_table import (
+    PinyinTable, pack_pinyin_dict, unpack_pinyin_dict
+)
+
 _current_dir = os.path.dirname(os.path.realpath(__file__))
 _json_path = os.path.join(_current_dir, 'pinyin_dict.json')
-pinyin_dict = {}
+
+
+def _parse_pinyin_dict(data):
+    return pack_pinyin_dict(
+        dict((int(k), v) for k, v in json.loads(data.decode('utf8')).items()))
 
 
 def _load_pinyin_dict():
-    global pinyin_dict
-    with open(_json_path, encoding='utf8') as fp:
-        pinyin_dict = json.loads(fp.read())
-    for k, v in pinyin_dict.copy().items():
-        del pinyin_dict[k]
-        pinyin_dict[int(k)] = v
+    # 缓存的是打包后的紧凑格式 (version=1)，与旧的 dict 格式缓存区分开
+    return unpack_pinyin_dict(
+        load_dict(_json_path, _parse_pinyin_dict, version=1))
 
 
-_load_pinyin_dict()
+# 首次访问时才读取 (优先读二进制缓存)
+pinyin_dict = PinyinTable(_load_pinyin_dict)
@@ -1,3 +1,3 @@
-from typing import Dict, Text
+from pypinyin._pinyin_table import PinyinTable
 
-pinyin_dict = ...  # type: Dict[int, Text]
+pinyin_dict = ...  # type: PinyinTable
@@ -3,7 +3,10 @@
 
 from __future__ import unicode_literals
 from argparse import ArgumentParser
+from itertools import chain
+import errno
 import logging
+import os
 import sys
 
 import pypinyin
@@ -76,27 +79,87 @@ def get_parser():
     # 输出多音字
     parser.add_argument('-m', '--heteronym', help='enable heteronym',
                         action='store_true')
+    # 逐行转换标准输入
+    parser.add_argument('-l', '--lines',
+                        help=('convert stdin line by line and write one'
+                              ' result per line as soon as it is ready'),
+                        action='store_true')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help=('number of processes used to convert lines'
+                              ' with --lines (default: 1)'))
     # 要查询的汉字
-    parser.add_argument('hans', nargs='+', help='chinese string')
+    parser.add_argument('hans', nargs='*', help='chinese string')
     return parser
 
 
+def format_result(result):
+    """把转换结果格式化为输出的一行"""
+    if not result:
+        return ''
+    elif isinstance(result, (list, tuple)):
+        if isinstance(result[0], (list, tuple)):
+            return ' '.join([','.join(s) for s in result])
+    return '{0}'.format(result)
+
+
+def _read_lines(stream):
+    encoding = getattr(stream, 'encoding', None) or 'utf-8'
+    for line in stream:
+        if PY2:
+            line = line.decode(encoding)
+        yield line.rstrip('\r\n')
+
+
+def convert_lines(lines, func, style, heteronym, separator, errors, jobs=1):
+    """逐行转换，按输入顺序产出每一行的结果
+
+    ``jobs`` 大于 1 时由 :py:func:`~pypinyin.pinyin_batch` 分组交给进程池
+    转换，同时在转换的行数有上限，输入再大也不会整体读入内存。
+    """
+    if func == 'slug':
+        results = pypinyin.pinyin_batch(
+            lines, style=style, heteronym=heteronym, errors=errors,
+            jobs=jobs)
+        return (separator.join(chain(*pys)) for pys in results)
+    return pypinyin.pinyin_batch(
+        lines, style=style, heteronym=heteronym, errors=errors, jobs=jobs)
+
+
+def _write_lines(stream, results):
+    encoding = getattr(stream, 'encoding', None) or 'utf-8'
+    for result in results:
+        line = format_result(result) + '\n'
+        if PY2:
+            line = line.encode(encoding)
+        stream.write(line)
+        # 输出是管道时也要立即写出，下游才能逐行读到结果
+        stream.flush()
+
+
 def main():
     # 禁用除 CRITICAL 外的日志消息
     logging.disable(logging.CRITICAL)
 
+    # 获取命令行选项和参数
+    parser = get_parser()
+    options = parser.parse_args(sys.argv[1:])
+    if options.jobs < 1:
+        parser.error('argument -j/--jobs: must be at least 1')
+    if options.jobs > 1 and not options.lines:
+        parser.error('argument -j/--jobs: only supported with --lines')
+    if options.lines and options.hans:
+        parser.error('hans cannot be used with --lines')
+
     # read hans from stdin
-    if not sys.stdin.isatty():
+    if not options.lines and not sys.stdin.isatty():
         pipe_data = sys.stdin.read().strip()
     else:
         pipe_data = ''
-    args = sys.argv[1:]
     if pipe_data:
-        args.append(pipe_data)
+        options.hans.append(pipe_data)
+    if not options.lines and not options.hans:
+        parser.error('the following arguments are required: hans')
 
-    # 获取命令行选项和参数
-    parser = get_parser()
-    options = parser.parse_args(args)
     if PY2:
         hans = [
             han.decode(sys.stdin.encoding or 'utf-8') for han in options.hans
@@ -123,21 +186,31 @@ def main():
     # 不输出任何字符，防止污染命令行命令的输出结果
     # 其实主要是为了干掉 jieba 内的 print 语句 ;)
     sys.stdout = sys.stderr = NullWriter()
+    if options.lines:
+        # 结果直接写到原来的标准输出，转换一行输出一行
+        try:
+            _write_lines(sys.__stdout__, convert_lines(
+                _read_lines(sys.stdin), options.func, style, heteronym,
+                separator, errors, jobs=options.jobs))
+        except IOError as e:
+            # 下游提前关闭了管道 (比如 ``| head``)：安静地结束
+            if e.errno != errno.EPIPE:
+                raise
+            # 退出时还会刷新标准输出，改为指向空设备以免再次报错
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.__stdout__.fileno())
+        finally:
+            sys.stdout = sys.__stdout__
+            sys.stderr = sys.__stderr__
+        return
+
     results = [func(han, style=style, **kwargs) for han in hans]
     # 恢复默认
     sys.stdout = sys.__stdout__
     sys.stderr = sys.__stderr__
 
     for result in results:
-        if not result:
-            print('')
-        elif result and isinstance(result, (list, tuple)):
-            if isinstance(result[0], (list, tuple)):
-                print(' '.join([','.join(s) for s in result]))
-            else:
-                print(result)
-        else:
-            print(result)
+        print(format_result(result))
 
 
 if __name__ == '__main__':
@@ -1,5 +1,7 @@
 from argparse import ArgumentParser
-from typing import Union, Text, ByteString
+from typing import Any, Iterable, Iterator, IO, Union, Text, ByteString
+
+from pypinyin.constants import Style
 
 
 class NullWriter(object):
@@ -9,4 +11,18 @@ class NullWriter(object):
 def get_parser() -> ArgumentParser: ...
 
 
+def format_result(result: Any) -> Text: ...
+
+
+def _read_lines(stream: IO[Any]) -> Iterator[Text]: ...
+
+
+def convert_lines(lines: Iterable[Text], func: Text, style: Style,
+                  heteronym: bool, separator: Text, errors: Text,
+                  jobs: int = ...) -> Iterator[Any]: ...
+
+
+def _write_lines(stream: IO[Any], results: Iterable[Any]) -> None: ...
+
+
 def main() -> None: ...
@@ -1,6 +1,4 @@
-from typing import Iterator
-from typing import Text
-from typing import Set
+from typing import Container, Iterable, Iterator, List, Optional, Set, Text
 
 
 class Seg(object):
@@ -22,15 +20,26 @@ class Seg(object):
 class PrefixSet(object):
     def __init__(self) -> None:
         self._set = ...  # type: Set[Text]
+        self._pending = ...  # type: List[Iterable[Text]]
         ...
 
     def train(self, word_s: Iterator[Text]) -> None: ...
 
+    def _build(self) -> None: ...
+
     def __contains__(self, key: Text) -> bool: ...
 
+    def _prefixes(self) -> Container[Text]: ...
+
+
+class SortedPrefixSet(PrefixSet):
+    def __init__(self) -> None:
+        self._words = ...  # type: List[Text]
+        ...
+
 
 p_set = ...  # type: PrefixSet
 seg = ...  # type: Seg
 
 
-def retrain(seg_instance: Seg) -> None: ...
+def retrain(seg_instance: Seg, words: Optional[Iterable[Text]] = ...) -> None: ...
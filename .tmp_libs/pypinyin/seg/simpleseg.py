@@ -1,18 +1,23 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import re
 from itertools import chain
 
 from pypinyin.compat import text_type, bytes_type
 from pypinyin.constants import RE_HANS, PHRASES_DICT
 from pypinyin.seg import mmseg
 
+# 去掉 RE_HANS 首尾的 ^ $，用于在整段文本中查找连续的汉字
+_RE_HANS_RUN = re.compile(RE_HANS.pattern[1:-1])
+
 
 def seg(hans):
     hans = simple_seg(hans)
     ret = []
     for x in hans:
-        if not RE_HANS.match(x):   # 没有拼音的字符，不再参与二次分词
+        # 每一段要么全是汉字要么全不是，看第一个字符就够了
+        if not RE_HANS.match(x[:1]):   # 没有拼音的字符，不再参与二次分词
             ret.append(x)
         elif PHRASES_DICT:
             ret.extend(list(mmseg.seg.cut(x)))
@@ -36,33 +41,20 @@ def simple_seg(hans):
 
 
 def _seg(chars):
-    """按是否是汉字进行分词"""
-    s = ''  # 保存一个词
-    ret = []  # 分词结果
-    flag = 0  # 上一个字符是什么? 0: 汉字, 1: 不是汉字
-
-    for n, c in enumerate(chars):
-        if RE_HANS.match(c):  # 汉字, 确定 flag 的初始值
-            if n == 0:  # 第一个字符
-                flag = 0
-
-            if flag == 0:
-                s += c
-            else:  # 上一个字符不是汉字, 分词
-                ret.append(s)
-                flag = 0
-                s = c
+    """按是否是汉字进行分词
 
-        else:  # 不是汉字
-            if n == 0:  # 第一个字符, 确定 flag 的初始值
-                flag = 1
-
-            if flag == 1:
-                s += c
-            else:  # 上一个字符是汉字, 分词
-                ret.append(s)
-                flag = 1
-                s = c
-
-    ret.append(s)  # 最后的词
+    用一次 ``finditer`` 找出所有连续的汉字，汉字之间的部分就是非汉字，
+    每一段只切片一次，耗时与文本长度成线性关系。
+    """
+    ret = []  # 分词结果
+    pos = 0
+    for match in _RE_HANS_RUN.finditer(chars):
+        start, end = match.span()
+        if start > pos:  # 前面的非汉字
+            ret.append(chars[pos:start])
+        ret.append(chars[start:end])
+        pos = end
+
+    if pos < len(chars) or not ret:  # 最后的非汉字 (或者空字符串)
+        ret.append(chars[pos:])
     return ret
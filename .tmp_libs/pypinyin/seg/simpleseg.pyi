@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
-from typing import List, Text
+from typing import Any, List, Text
+
+_RE_HANS_RUN = ...  # type: Any
 
 
 def seg(hans: Text) -> List[Text]: ...
@@ -4,6 +4,13 @@ from functools import wraps
 # 存储各拼音风格对应的实现
 _registry = {}
 
+# 内置拼音风格的转换结果表：(style, strict) -> {原始拼音: 转换结果}
+# 内置实现的结果只取决于拼音和 strict，带声调的拼音不过一千多个，
+# 每个拼音只需用正则转换一次，之后都是查表。自定义的实现不查表。
+_tables = {}
+# 每张表最多收录的拼音数，防止异常输入让表无限增长
+_TABLE_SIZE = 10000
+
 
 def convert(pinyin, style, strict, default=None, **kwargs):
     """根据拼音风格把原始拼音转换为不同的格式
@@ -22,8 +29,17 @@ def convert(pinyin, style, strict, default=None, **kwargs):
     :return: 按照拼音风格进行处理过后的拼音字符串
     :rtype: unicode
     """
+    table = _tables.get((style, strict))
+    if table is not None:
+        converted = table.get(pinyin)
+        if converted is not None:
+            return converted
+
     if style in _registry:
-        return _registry[style](pinyin, strict=strict, **kwargs)
+        converted = _registry[style](pinyin, strict=strict, **kwargs)
+        if table is not None and len(table) < _TABLE_SIZE:
+            table[pinyin] = converted
+        return converted
     return default
 
 
@@ -46,11 +62,11 @@ def register(style, func=None):
         register('echo', echo)
     """
     if func is not None:
-        _registry[style] = func
+        _register(style, func)
         return
 
     def decorator(func):
-        _registry[style] = func
+        _register(style, func)
 
         @wraps(func)
         def wrapper(pinyin, **kwargs):
@@ -60,8 +76,16 @@ def register(style, func=None):
     return decorator
 
 
+def _register(style, func):
+    _registry[style] = func
+    # 新注册的实现可能依赖 han 等其他参数，不再查表
+    _tables.pop((style, True), None)
+    _tables.pop((style, False), None)
+
+
 def auto_discover():
     """自动注册内置的拼音风格实现"""
+    before = dict(_registry)
     from pypinyin.style import (  # noqa
         initials,
         tone,
@@ -73,3 +97,8 @@ def auto_discover():
         gwoyeu,
         braille_mainland,
     )
+    # 只为这次导入时注册的内置实现建表
+    for style, func in _registry.items():
+        if before.get(style) is not func:
+            _tables[(style, True)] = {}
+            _tables[(style, False)] = {}
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Optional, Callable, Dict, Text, Union
+from typing import Any, Optional, Callable, Dict, Text, Tuple, Union
 
 from pypinyin.constants import Style
 
@@ -8,6 +8,8 @@ TRegisterFunc = Optional[Callable[[Text, Dict[Any, Any]], Text]]
 TWrapperFunc = Optional[Callable[[Text, Dict[Any, Any]], Text]]
 
 _registry = {}  # type: Dict[Union[TStyle, int, str, Any], TRegisterFunc]
+_tables = {}  # type: Dict[Tuple[Union[TStyle, int, str, Any], bool], Dict[Text, Text]]
+_TABLE_SIZE = ...  # type: int
 
 
 def convert(pinyin: Text, style: TStyle, strict: bool,
@@ -17,4 +19,7 @@ def convert(pinyin: Text, style: TStyle, strict: bool,
 def register(style: Union[TStyle, int, str, Any],
              func: TRegisterFunc = ...) -> TWrapperFunc: ...
 
+def _register(style: Union[TStyle, int, str, Any],
+              func: TRegisterFunc) -> None: ...
+
 def auto_discover() -> None: ...
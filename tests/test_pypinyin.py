@@ -0,0 +1,134 @@
+"""Regressions for the bundled pypinyin: concurrent first use of its lazily
+loaded tables, the converter result cache, and converter subclasses that skip
+DefaultConverter.__init__.
+
+    python3 -m unittest tests/test_pypinyin.py
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '.tmp_libs'))
+
+from pypinyin.constants import PHRASES_DICT
+from pypinyin.core import Pinyin, load_phrases_dict
+from pypinyin._dict_cache import LazyDict
+from pypinyin._pinyin_table import PinyinTable, pack_pinyin_dict, unpack_pinyin_dict
+from pypinyin.converter import DefaultConverter
+from pypinyin.seg.mmseg import PrefixSet, SortedPrefixSet
+
+N_THREADS = 16
+
+
+def run_concurrently(target):
+    """Release N_THREADS threads into target() at once; return results and errors."""
+    barrier = threading.Barrier(N_THREADS)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=worker) for _ in range(N_THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def slow_loader(value):
+    """A loader that counts its calls and is slow enough for threads to overlap."""
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return value
+    return loader, calls
+
+
+class SlowWords(list):
+    """A word list that pauses halfway through iteration, as a big dictionary would."""
+
+    def __iter__(self):
+        for i, word in enumerate(list.__iter__(self)):
+            if i == len(self) // 2:
+                time.sleep(0.05)
+            yield word
+
+
+class ConcurrentFirstUseTest(unittest.TestCase):
+    def test_lazy_dict(self):
+        loader, calls = slow_loader({'中国': [['zhōng'], ['guó']]})
+        d = LazyDict(loader)
+        results, errors = run_concurrently(lambda: d.get('中国'))
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [[['zhōng'], ['guó']]] * N_THREADS)
+        self.assertEqual(len(calls), 1)
+
+    def test_pinyin_table(self):
+        packed = pack_pinyin_dict({0x4e2d: 'zhōng,zhòng', 0x56fd: 'guó'})
+        loader, calls = slow_loader(unpack_pinyin_dict(packed))
+        table = PinyinTable(loader)
+        results, errors = run_concurrently(lambda: (table.pinyins(0x4e2d), table.pinyins(0x56fd)))
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [(('zhōng', 'zhòng'), ('guó',))] * N_THREADS)
+        self.assertEqual(len(calls), 1)
+
+    def test_prefix_sets(self):
+        words = SlowWords('中国人{0}'.format(i) for i in range(1000))
+        for cls in (PrefixSet, SortedPrefixSet):
+            prefix_set = cls()
+            prefix_set.train(words)
+            # The last word's prefixes are only added once the build is finished
+            results, errors = run_concurrently(lambda: '中国人999' in prefix_set)
+            with self.subTest(cls=cls.__name__):
+                self.assertEqual(errors, [])
+                self.assertEqual(results, [True] * N_THREADS)
+
+
+class ConverterCacheTest(unittest.TestCase):
+    def test_cache_is_bounded(self):
+        converter = DefaultConverter(cache_size=4)
+        pinyin = Pinyin(converter)
+        for word in ['中国', '银行', '北京', '中国', '上海', '广州', '银行']:
+            pinyin.lazy_pinyin(word)
+            self.assertLessEqual(converter.cache_info().currsize, 4)
+        info = converter.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 6, 4))
+        # The recently used 中国 survived; 北京 was the least recently used
+        pinyin.lazy_pinyin('中国')
+        pinyin.lazy_pinyin('北京')
+        info = converter.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 7))
+
+    def test_load_phrases_dict_invalidates(self):
+        original = PHRASES_DICT['银行']
+        self.addCleanup(load_phrases_dict, {'银行': original})
+        converter = DefaultConverter(cache_size=16)
+        pinyin = Pinyin(converter)
+        self.assertEqual(pinyin.pinyin('银行'), [['yín'], ['háng']])
+        load_phrases_dict({'银行': [['yín'], ['xíng']]})
+        self.assertEqual(converter.cache_info().currsize, 0)
+        self.assertEqual(pinyin.pinyin('银行'), [['yín'], ['xíng']])
+
+
+class ConverterSubclassTest(unittest.TestCase):
+    def test_init_without_super(self):
+        class TaggedConverter(DefaultConverter):
+            def __init__(self):
+                self.tag = 'x'
+
+        converter = TaggedConverter()
+        self.assertEqual(Pinyin(converter).pinyin('中国'), [['zhōng'], ['guó']])
+        self.assertEqual(converter.cache_info().maxsize, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+"""Incremental update() and the alternative extract() modes must reproduce the
+default extract() byte for byte, and streaming extract() must keep its tables
+bounded by max_ngrams. Background models must bound the counts they did not
+keep and refuse to score longer fragments than they counted.
+
+    python3 -m unittest tests/test_word_discovery.py
+"""
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from word_discovery import NewWordDiscovery
+from word_tables import BackgroundModel
+
+CORPUS = os.path.join(ROOT, 'xiyouji.txt')
+
+
+def line_cuts(text, first, step, count):
+    """Offsets just past a newline: the first near `first`, then every ~`step` chars."""
+    cuts = [text.index('\n', first) + 1]
+    while len(cuts) < count:
+        cuts.append(text.index('\n', cuts[-1] + step) + 1)
+    return cuts
+
+
+class UpdateMatchesExtractTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        # No dictionary directory: known-word filtering is not what is under test
+        self.dict_dir = os.path.join(self.tmp, 'dicts')
+        with open(CORPUS, 'r', encoding='utf-8') as f:
+            self.text = f.read(200000)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def run_quietly(self, method, *args, min_count=5, **kwargs):
+        events = []
+        discovery = NewWordDiscovery(self.dict_dir, on_event=events.append)
+        discovery.min_count = min_count
+        with contextlib.redirect_stdout(io.StringIO()):
+            getattr(discovery, method)(*args, **kwargs)
+        return events
+
+    def extract_bytes(self, text, min_count):
+        with open(self.path('full.txt'), 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.run_quietly('extract', self.path('full.txt'), self.path('full.json'),
+                         min_count=min_count)
+        with open(self.path('full.json'), 'rb') as f:
+            return f.read()
+
+    def test_repeated_updates(self):
+        state = self.path('corpus.state')
+        cuts = [0] + line_cuts(self.text, 60000, 8000, 14)
+        compactions = []
+        for i in range(1, len(cuts)):
+            # The last updates lower min_count, which forces a full rescore
+            min_count = 3 if i >= len(cuts) - 3 else 5
+            with open(self.path('piece.txt'), 'w', encoding='utf-8') as f:
+                f.write(self.text[cuts[i - 1]:cuts[i]])
+            events = self.run_quietly('update', [self.path('piece.txt')], state,
+                                      self.path('update.json'), min_count=min_count)
+            compactions += [e['compacted'] for e in events
+                            if e['event'] == 'stage' and e['stage'] == 'save_state']
+            with open(self.path('update.json'), 'rb') as f:
+                updated = f.read()
+            with self.subTest(update=i, min_count=min_count):
+                self.assertEqual(updated, self.extract_bytes(self.text[:cuts[i]], min_count))
+
+        # Both the journal path and mid-run compaction must have been exercised
+        self.assertIn(False, compactions[1:])
+        self.assertIn(True, compactions[1:-3])
+
+
+class ModesMatchDefaultTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.corpus = os.path.join(self.tmp, 'corpus.txt')
+        with open(CORPUS, 'r', encoding='utf-8') as f:
+            text = f.read(80000)
+        with open(self.corpus, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def extract_bytes(self, name, **kwargs):
+        output = os.path.join(self.tmp, name + '.json')
+        discovery = NewWordDiscovery(os.path.join(self.tmp, 'dicts'))
+        discovery.min_count = 3
+        with contextlib.redirect_stdout(io.StringIO()):
+            discovery.extract(self.corpus, output, **kwargs)
+        with open(output, 'rb') as f:
+            return f.read()
+
+    def test_modes(self):
+        expected = self.extract_bytes('default')
+        modes = {
+            'suffix': dict(backend='suffix'),
+            'vectorized': dict(vectorized=True),
+            'jobs': dict(jobs=2),
+        }
+        for name, kwargs in modes.items():
+            with self.subTest(mode=name):
+                self.assertEqual(self.extract_bytes(name, **kwargs), expected)
+
+
+class StreamingBoundTest(unittest.TestCase):
+    MAX_NGRAMS = 20000
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def neighbor_keys(self, n_chars):
+        """Stream n_chars of random Han text; return the neighbour stage's key counts."""
+        rng = random.Random(0)
+        alphabet = [chr(0x4e00 + i) for i in range(400)]
+        path = os.path.join(self.tmp, f'random{n_chars}.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            for _ in range(n_chars // 50):
+                f.write(''.join(rng.choices(alphabet, k=50)) + '\n')
+        events = []
+        discovery = NewWordDiscovery(os.path.join(self.tmp, 'dicts'), on_event=events.append)
+        with contextlib.redirect_stdout(io.StringIO()):
+            discovery.extract(path, os.path.join(self.tmp, 'out.json'), streaming=True,
+                              chunk_size=1 << 16, max_ngrams=self.MAX_NGRAMS)
+        stage, = [e for e in events if e['event'] == 'stage' and e['stage'] == 'neighbors']
+        return stage['right_keys'], stage['left_keys']
+
+    def test_neighbors_stay_bounded(self):
+        # Both inputs have far more distinct n-grams than the cap
+        for n_chars in (50000, 200000):
+            right, left = self.neighbor_keys(n_chars)
+            with self.subTest(n_chars=n_chars):
+                self.assertLessEqual(right, self.MAX_NGRAMS)
+                self.assertLessEqual(left, self.MAX_NGRAMS)
+
+
+class BackgroundModelTest(unittest.TestCase):
+    ABSENT = '龘龘'
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.corpus = os.path.join(self.tmp, 'corpus.txt')
+        with open(CORPUS, 'r', encoding='utf-8') as f:
+            text = f.read(100000)
+        with open(self.corpus, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def build(self, name, **kwargs):
+        path = os.path.join(self.tmp, name)
+        discovery = NewWordDiscovery(os.path.join(self.tmp, 'dicts'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            discovery.build_background([self.corpus], path, **kwargs)
+        return BackgroundModel(path)
+
+    def test_absent_count_is_bounded(self):
+        pruned = self.build('pruned.bg', min_count=2, max_ngrams=5000)
+        # A prune floor above min_count - 1 is the tighter bound
+        self.assertGreater(pruned.floor, 1)
+        self.assertEqual(pruned.count(self.ABSENT), pruned.floor)
+
+        unpruned = self.build('full.bg', min_count=3)
+        # Without pruning, anything absent was seen at most min_count - 1 times
+        self.assertEqual(unpruned.floor, 0)
+        self.assertEqual(unpruned.count(self.ABSENT), 2)
+
+    def test_rejects_shorter_model(self):
+        self.build('short.bg', max_word_len=3)
+        output = os.path.join(self.tmp, 'out.json')
+        discovery = NewWordDiscovery(os.path.join(self.tmp, 'dicts'),
+                                     background=os.path.join(self.tmp, 'short.bg'))
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            discovery.extract(self.corpus, output, max_word_len=4)
+        self.assertIn('max_word_len=4', stdout.getvalue())
+        self.assertFalse(os.path.exists(output))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+"""Benchmark NewWordDiscovery stage by stage.
+
+Runs extraction on xiyouji.txt and on synthetic corpora built by sampling
+its sentences, and records wall time, peak RSS and throughput for each
+stage (split, count, neighbors, score, dump) from NewWordDiscovery's
+on_event stage events. Throughput is measured in each stage's own unit
+(sentences split, characters counted, neighbour keys built, candidates
+scored, results dumped), so count and score rates compare across
+streaming and in-memory runs. Every corpus runs in a fresh subprocess so peak
+RSS is not polluted by earlier runs.
+
+    python3 tools/bench_word_discovery.py --sizes 1M,10M,100M -o bench.json
+    python3 tools/bench_word_discovery.py --sizes 1M -o new.json --compare bench.json
+    python3 tools/bench_word_discovery.py --sizes 100M --stream --max-ngrams 2000000
+
+Streaming runs read and split the text while counting and emit no split
+stage; stages missing from a run are reported as n/a.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from word_discovery import NewWordDiscovery
+
+BASE_CORPUS = os.path.join(ROOT, 'xiyouji.txt')
+STAGES = ['split', 'count', 'neighbors', 'score', 'dump']
+# Throughput unit of each stage and the stage event counters that add up to it
+STAGE_UNITS = {
+    'split': ('sentences', ['sentences']),
+    'count': ('chars', ['chars']),
+    'neighbors': ('neighbor_keys', ['right_keys', 'left_keys']),
+    'score': ('candidates', ['candidates']),
+    'dump': ('results', ['results']),
+}
+
+
+def parse_size(text):
+    match = re.fullmatch(r'(\d+)([KMG]?)', text.strip().upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {text}")
+    return int(match.group(1)) * {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}[match.group(2)]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / 1024
+
+
+def make_synthetic(size, path, seed=0):
+    """Write about `size` bytes of text by sampling lines of the base corpus."""
+    with open(BASE_CORPUS, 'r', encoding='utf-8') as f:
+        lines = [line for line in f if line.strip()]
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < size:
+            batch = ''.join(rng.choices(lines, k=1000))
+            f.write(batch)
+            written += len(batch.encode('utf-8'))
+
+
+def run_stages(path, max_word_len, backend, vectorized, jobs, streaming=False,
+               max_ngrams=5000000):
+    """Run extraction on one file and collect its stage events."""
+    events = []
+    discovery = NewWordDiscovery(os.path.join(ROOT, 'dicts'), on_event=events.append)
+    with tempfile.TemporaryDirectory() as tmp:
+        discovery.extract(path, os.path.join(tmp, 'out.json'), max_word_len=max_word_len,
+                          jobs=jobs, backend=backend, vectorized=vectorized,
+                          streaming=streaming, max_ngrams=max_ngrams)
+
+    stages = {}
+    summary = {}
+    for event in events:
+        if event['event'] == 'summary':
+            summary = event
+        if event['event'] != 'stage':
+            continue
+        name = event['stage']
+        seconds = event['seconds']
+        stages[name] = {
+            'seconds': seconds,
+            'peak_rss_mb': event['peak_rss_mb'],
+            'counters': {k: v for k, v in event.items()
+                         if k not in ('event', 'stage', 'seconds', 'time', 'peak_rss_mb')},
+        }
+        if name in STAGE_UNITS:
+            unit, keys = STAGE_UNITS[name]
+            done = sum(event.get(key, 0) for key in keys)
+            stages[name].update({
+                'unit': unit,
+                unit: done,
+                f'{unit}_per_sec': round(done / seconds, 1) if seconds > 0 else None,
+            })
+
+    return {
+        'chars': summary.get('chars'),
+        'results': summary.get('results'),
+        'total_seconds': round(sum(s['seconds'] for s in stages.values()), 4),
+        'peak_rss_mb': summary.get('peak_rss_mb', peak_rss_mb()),
+        'stages': stages,
+    }
+
+
+def run_in_subprocess(path, args):
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', path,
+           '--max-word-len', str(args.max_word_len), '--backend', args.backend,
+           '--jobs', str(args.jobs), '--max-ngrams', str(args.max_ngrams)]
+    if args.vectorized:
+        cmd.append('--vectorized')
+    if args.stream:
+        cmd.append('--stream')
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    # The pipeline prints progress lines; the result is the last line
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def stage_seconds(run, stage):
+    """Seconds spent in a stage, or None if the run did not report it."""
+    return run['stages'].get(stage, {}).get('seconds')
+
+
+def format_seconds(seconds):
+    return 'n/a' if seconds is None else f"{seconds:.2f}s"
+
+
+def compare(current, baseline):
+    """Print per-stage time ratios against a previous benchmark file."""
+    old_runs = {run['corpus']: run for run in baseline['runs']}
+    print(f"\nCompared with {baseline.get('commit')}:")
+    for run in current['runs']:
+        old = old_runs.get(run['corpus'])
+        if not old:
+            continue
+        parts = []
+        for stage in STAGES + ['total']:
+            new_s = run['total_seconds'] if stage == 'total' else stage_seconds(run, stage)
+            old_s = old['total_seconds'] if stage == 'total' else stage_seconds(old, stage)
+            parts.append(f"{stage} {new_s / old_s:.2f}x" if new_s is not None and old_s
+                         else f"{stage} n/a")
+        rss = (run['peak_rss_mb'] / old['peak_rss_mb']
+               if run['peak_rss_mb'] and old['peak_rss_mb'] else float('nan'))
+        print(f"  {run['corpus']}: " + ", ".join(parts) + f", rss {rss:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark word_discovery stages")
+    parser.add_argument('--sizes', default='1M,10M',
+                        help="Comma separated synthetic corpus sizes, e.g. 1M,10M,100M,1G")
+    parser.add_argument('--no-base', action='store_true', help="Skip xiyouji.txt itself")
+    parser.add_argument('--max-word-len', type=int, default=4)
+    parser.add_argument('--backend', choices=['counter', 'suffix'], default='counter')
+    parser.add_argument('--vectorized', action='store_true')
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--stream', action='store_true',
+                        help="Use streaming extraction with a bounded n-gram table")
+    parser.add_argument('--max-ngrams', type=int, default=5000000,
+                        help="N-gram table limit for --stream")
+    parser.add_argument('-o', '--output', help="Write JSON results to this file")
+    parser.add_argument('--compare', help="Previous JSON results to compare against")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_stages(args.worker, args.max_word_len, args.backend,
+                            args.vectorized, args.jobs, args.stream, args.max_ngrams)
+        print(json.dumps(result))
+        return
+
+    labels = [s.strip().upper() for s in args.sizes.split(',') if s.strip()]
+    sizes = [parse_size(label) for label in labels]
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'max_word_len': args.max_word_len,
+            'backend': args.backend,
+            'vectorized': args.vectorized,
+            'jobs': args.jobs,
+            'streaming': args.stream,
+            'max_ngrams': args.max_ngrams,
+        },
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpora = [] if args.no_base else [('xiyouji.txt', BASE_CORPUS)]
+        for label, size in zip(labels, sizes):
+            path = os.path.join(tmp, f'synthetic_{label}.txt')
+            make_synthetic(size, path)
+            corpora.append((f'synthetic_{label}', path))
+
+        for name, path in corpora:
+            print(f"Running {name} ({os.path.getsize(path) / (1 << 20):.1f} MB)...")
+            run = run_in_subprocess(path, args)
+            run['corpus'] = name
+            run['bytes'] = os.path.getsize(path)
+            report['runs'].append(run)
+            stage_line = ", ".join(f"{s} {format_seconds(stage_seconds(run, s))}"
+                                   for s in STAGES)
+            peak = run['peak_rss_mb']
+            print(f"  {stage_line} | total {run['total_seconds']:.2f}s, "
+                  f"peak {'n/a' if peak is None else f'{peak:.0f} MB'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
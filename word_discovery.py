@@ -1,39 +1,409 @@
+import heapq
 import json
 import os
+import pickle
 import re
 import math
+import sys
+import posixpath
+import struct
+import time
 import zipfile
-from collections import Counter
+import xml.etree.ElementTree as ET
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import chain
+from multiprocessing import Pool
+from urllib.parse import unquote
+
+from word_tables import BackgroundModel, KnownWordIndex, StateTable
+
+try:
+    import numpy as np
+except ImportError:  # 仅后缀数组后端需要 numpy
+    np = None
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，内存采样为 None
+    resource = None
+
+# 汉字码点区间：基本区 (与早期版本一致到 U+9FA5)、扩展 A 区、扩展 B 区
+HAN_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FA5), (0x20000, 0x2A6DF))
+
+# 非汉字字符：用于切分语句片段，避免跨句组合
+NON_HAN_RE = re.compile('[^%s]+' % ''.join('%s-%s' % (chr(lo), chr(hi)) for lo, hi in HAN_RANGES))
+
+# 预编译已知词索引的文件名 (位于词库目录下)
+KNOWN_INDEX_NAME = '.known_words.idx'
+
+
+def _peak_rss_mb():
+    """当前进程的峰值常驻内存 (MB)"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位是 KiB，macOS 上是字节
+    return round(rss / (1 << 20) if sys.platform == 'darwin' else rss / 1024, 1)
+
+
+class JsonLinesTelemetry:
+    """把 on_event 事件逐行写成 JSON，便于长时间运行后分析各阶段耗时"""
+
+    def __init__(self, path):
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __call__(self, event):
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JsonLinesSink:
+    """逐条写出评分结果的 JSON Lines 写入器，结果字典不会在内存中完整生成"""
+
+    def __init__(self, f):
+        self._file = f
+        self.count = 0
+
+    def __call__(self, word, record):
+        self._file.write(json.dumps({"word": word, **record}, ensure_ascii=False) + "\n")
+        self.count += 1
+
+
+def _han_spans(text, chunk_size=1 << 22):
+    """向量化切分：返回长度大于 1 的汉字连续段的 (starts, ends) 下标数组
+
+    按 chunk_size 个字符分块转成 UTF-32 码点数组，码点与 str 下标一一对应；
+    由汉字掩码的差分得到段边界，跨块的段在块边界处接续。不生成任何片段字符串。
+    """
+    starts, ends = [], []
+    pending = None  # 上一块以汉字结尾时，该段的起点
+    for base in range(0, len(text), chunk_size):
+        chunk = text[base:base + chunk_size]
+        codes = np.frombuffer(chunk.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+        mask = np.zeros(len(codes), dtype=np.int8)
+        for lo, hi in HAN_RANGES:
+            mask[(codes >= lo) & (codes <= hi)] = 1
+        edges = np.flatnonzero(np.diff(mask, prepend=0, append=0)) + base
+        s, e = edges[0::2], edges[1::2]
+        if pending is not None:
+            if len(s) and s[0] == base:
+                s[0] = pending
+            else:
+                starts.append(np.array([pending]))
+                ends.append(np.array([base]))
+            pending = None
+        if len(e) and e[-1] == base + len(chunk) and e[-1] < len(text):
+            pending = s[-1]
+            s, e = s[:-1], e[:-1]
+        keep = e - s > 1
+        starts.append(s[keep])
+        ends.append(e[keep])
+    if not starts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts, ends = np.concatenate(starts), np.concatenate(ends)
+    keep = ends - starts > 1
+    return starts[keep], ends[keep]
+
+
+def _count_chunk(args):
+    """进程池任务：统计一块语句片段的 N-gram"""
+    sentences, max_word_len = args
+    return NewWordDiscovery._count_ngrams(sentences, max_word_len)
+
+
+# 分片计数进程共用的语料与其字符集 (由进程池的 initializer 设置)
+_shard_text = None
+_shard_chars = None
+
+
+def _init_shard_worker(text):
+    global _shard_text, _shard_chars
+    _shard_text = text
+    _shard_chars = set(text)
+    _shard_chars.discard('\n')
+
+
+def _count_shard(args):
+    """进程池任务：只统计首字码点 % n_shards == shard 的 N-gram
+
+    语料是以换行连接的语句片段。各分片的键互不相交，返回 (计数表,
+    各键首次出现的位置)；位置按 (下标, 长度) 编码，与串行统计的插入顺序一致。
+    """
+    shard, n_shards, max_word_len = args
+    text = _shard_text
+    own = [ch for ch in _shard_chars if ord(ch) % n_shards == shard]
+    counts = {}
+    first = array('q')
+    if not own:
+        return counts, first
+    stride = max_word_len + 2
+    end = -1
+    for m in re.finditer('[%s]' % re.escape(''.join(own)), text):
+        i = m.start()
+        if i > end:
+            end = text.find('\n', i)
+            if end < 0:
+                end = len(text)
+        base = i * stride
+        for n in range(1, min(max_word_len + 1, end - i) + 1):
+            key = text[i:i + n]
+            c = counts.get(key)
+            if c is None:
+                counts[key] = 1
+                first.append(base + n)
+            else:
+                counts[key] = c + 1
+    return counts, first
+
+
+def _clogc_delta(old, new):
+    """计数由 old 变为 new 时 c*log2(c) 的增量，累加器因此无需保留邻字列表"""
+    return new * math.log2(new) - (old * math.log2(old) if old else 0.0)
+
+
+def _batch_scores(counts, parts, right_acc, left_acc, total_len):
+    """批量计算最小 PMI 与左右熵较小值
+
+    counts: (m,) 候选词计数；parts: (m, k, 2) 各切分点两侧的计数，0 表示跳过；
+    right_acc / left_acc: (m, 2) 邻字累加器 (sum c, sum c*log2(c))，无邻字时为 0。
+    运算顺序与逐词计算相同，保证浮点结果一致。
+    """
+    p_word = counts / total_len
+    c1 = parts[:, :, 0]
+    c2 = parts[:, :, 1]
+    valid = (c1 > 0) & (c2 > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pmi = np.log2(p_word[:, None] / ((c1 / total_len) * (c2 / total_len)))
+    pmi = np.where(valid, pmi, np.inf).min(axis=1)
+
+    entropy = np.minimum(_accumulated_entropy(right_acc), _accumulated_entropy(left_acc))
+    return pmi, entropy
+
+
+def _accumulated_entropy(acc):
+    """由累加器批量计算熵：H = log2(S) - T / S"""
+    total = acc[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = np.maximum(np.log2(total) - acc[:, 1] / total, 0.0)
+    return np.where(total > 0, entropy, 0.0)
+
+
+def _sequential_segment_sums(values, lengths):
+    """分段求和：跨段向量化，段内按原顺序逐项累加，与 Python 循环累加结果一致"""
+    sums = np.zeros(len(lengths))
+    if not len(lengths):
+        return sums
+    starts = np.cumsum(lengths) - lengths
+    # 段按长度降序排列后，第 j 轮仍有第 j 项的段恰好是一个前缀
+    order = np.argsort(-lengths, kind='stable')
+    starts = starts[order]
+    remaining = lengths[order]
+    acc = np.zeros(len(order))
+    for j in range(int(remaining[0])):
+        active = int(np.searchsorted(-remaining, -j, side='left'))
+        acc[:active] += values[starts[:active] + j]
+    sums[order] = acc
+    return sums
+
+
+def _word_rows(words, width):
+    """把词语编码为 (len(words), width) 的 UTF-32 码点矩阵，不足 width 的位置补 0
+
+    只做一次 join 与编码，逐词的切片由下标运算完成。
+    """
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    codes = np.frombuffer(''.join(words).encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    starts = np.cumsum(lengths) - lengths
+    valid = np.arange(width) < lengths[:, None]
+    pos = np.where(valid, starts[:, None] + np.arange(width), 0)
+    rows = np.zeros((len(words), width), dtype='<u4')
+    rows[valid] = codes[pos[valid]]
+    return rows, lengths
+
+
+def _row_keys(rows):
+    """把码点矩阵的每一行看作一个定长字节串，便于整体排序与比较"""
+    rows = np.ascontiguousarray(rows)
+    return rows.view(np.dtype((np.void, rows.shape[1] * rows.itemsize))).ravel()
+
+
+class _RowTable:
+    """以码点行为键的只读查找表：键排序后用 searchsorted 批量精确查找
+
+    行中出现的字符先映射为稠密编号，能装进 63 位时把整行打包成一个 int64
+    键 (整数比较远快于字节串比较)，否则退回定长字节串键。
+    """
+
+    def __init__(self, rows, values):
+        seen = np.zeros(int(rows.max(initial=0)) + 1, dtype=bool)
+        seen[rows] = True
+        seen[0] = True
+        chars = np.flatnonzero(seen)
+        bits = (len(chars) - 1).bit_length()
+        self._bits = bits if bits * rows.shape[1] <= 63 else None
+        # 码点 -> 稠密编号，不在表内的字符为 -1
+        self._char_ids = np.full(len(seen), -1, dtype=np.int64)
+        self._char_ids[chars] = np.arange(len(chars))
+        keys, _ = self._encode(rows)
+        # order: 按键排序后的行下标，调用方按此顺序查询时排序几乎不花时间
+        self.order = np.argsort(keys, kind='stable')
+        self._keys = keys[self.order]
+        self._values = values
+
+    def _encode(self, rows):
+        """返回 (每行的键, 每行字符是否都在表内)，全部在表内时后者为 None"""
+        if self._bits is None:
+            return _row_keys(rows), None
+        char_ids = self._char_ids
+        known = None
+        if rows.max(initial=0) >= len(char_ids):
+            outside = rows >= len(char_ids)
+            ids = char_ids[np.where(outside, 0, rows)]
+            ids[outside] = -1
+        else:
+            ids = char_ids[rows]
+        if ids.min(initial=0) < 0:
+            known = (ids >= 0).all(axis=1)
+        keys = ids[:, 0].copy()
+        for j in range(1, rows.shape[1]):
+            keys <<= self._bits
+            keys |= ids[:, j]
+        return keys, known
+
+    def get(self, rows, default=0):
+        """批量查找，返回与 rows 对应的值，不存在的行取 default"""
+        values = self._values
+        if not len(self._keys):
+            return np.full((len(rows),) + values.shape[1:], default, dtype=values.dtype)
+        query, known = self._encode(rows)
+        # 先排序再查找，二分查找的访存基本连续，比乱序查找快几倍
+        order = np.argsort(query, kind='stable')
+        pos = np.empty(len(query), dtype=np.intp)
+        pos[order] = np.searchsorted(self._keys, query[order])
+        np.minimum(pos, len(self._keys) - 1, out=pos)
+        found = self._keys[pos] == query
+        if known is not None:
+            found &= known
+        found = found.reshape((-1,) + (1,) * (values.ndim - 1))
+        return np.where(found, values[self.order[pos]], default)
+
+
+def _log_likelihood(a, n1, b, n2):
+    """Dunning 对数似然比 G2：片段在两份语料中分别出现 a / b 次，语料规模为 n1 / n2"""
+    e1 = n1 * (a + b) / (n1 + n2)
+    e2 = n2 * (a + b) / (n1 + n2)
+    g2 = 0.0
+    if a > 0:
+        g2 += a * math.log(a / e1)
+    if b > 0:
+        g2 += b * math.log(b / e2)
+    return 2 * g2
+
 
 class NewWordDiscovery:
-    def __init__(self, dict_dir):
+    def __init__(self, dict_dir, on_event=None, background=None):
+        # on_event: 可选回调，接收 stage / progress / prune / summary 等事件字典
+        self.on_event = on_event
         self.known_words = self._load_known_words(dict_dir)
+        self._known_set = None  # 大批量查询已知词时由索引转成的 set
+        # background: 可选的背景模型文件 (build_background 生成)，给出时按对数似然比
+        # 只保留在领域语料中显著偏多的片段，过滤"现为"、"者可"等通用搭配
+        self.background = BackgroundModel(background) if background else None
         # 优化后的参数
         self.min_count = 5      # 最小词频：太低容易引入噪声
         self.min_pmi = 4.0      # 最小凝固度 (PMI)：值越高，字之间结合越紧密
         self.min_entropy = 0.8  # 最小自由度 (Entropy)：关键参数！过滤"血红蛋"、"化道"等残缺词
+        self.min_llr = 10.83    # 对比模式的最小对数似然比：对应卡方检验 p < 0.001
+
+    def _emit(self, event, **fields):
+        """向 on_event 回调发送一条事件，附带时间戳与峰值内存"""
+        if self.on_event is None:
+            return
+        self.on_event(dict(event=event, **fields, time=round(time.time(), 3),
+                           peak_rss_mb=_peak_rss_mb()))
+
+    @contextmanager
+    def _stage(self, name):
+        """计时一个处理阶段；调用方可往 yield 出的字典里填写计数器"""
+        info = {}
+        start = time.perf_counter()
+        yield info
+        self._emit('stage', stage=name, seconds=round(time.perf_counter() - start, 4), **info)
 
     def _load_known_words(self, dict_dir):
-        known = set()
+        """加载已知词：优先使用内存映射的预编译索引，词库文件变化时才重建"""
         if not os.path.exists(dict_dir):
+            return set()
+
+        index_path = os.path.join(dict_dir, KNOWN_INDEX_NAME)
+        manifest = self._dict_manifest(dict_dir)
+        try:
+            index = KnownWordIndex(index_path)
+            if index.manifest == manifest:
+                return index
+        except (OSError, ValueError, struct.error):
+            pass
+
+        print("词库有变化，正在重建已知词索引...")
+        known = self._scan_known_words(dict_dir)
+        try:
+            KnownWordIndex.build(index_path, known, manifest)
+            return KnownWordIndex(index_path)
+        except OSError as e:
+            print(f"写入已知词索引失败，本次直接使用内存词表: {e}")
             return known
-            
+
+    def _known_lookup(self, n_lookups):
+        """返回用于判断已知词的容器
+
+        内存映射索引每次查询都是 Python 层的二分查找 (约 4.5 微秒)；查询次数
+        超过索引词数的 1/8 时，一次性转成 set 更快。
+        """
+        known = self.known_words
+        if isinstance(known, KnownWordIndex) and n_lookups > len(known) // 8:
+            if self._known_set is None:
+                self._known_set = known.to_set()
+            return self._known_set
+        return known
+
+    def _dict_manifest(self, dict_dir):
+        """词库清单：{相对路径: [mtime_ns, 文件大小]}，用于判断索引是否过期"""
+        manifest = {}
+        for root, dirs, files in os.walk(dict_dir):
+            for file in files:
+                if file.endswith('.json'):
+                    path = os.path.join(root, file)
+                    st = os.stat(path)
+                    manifest[os.path.relpath(path, dict_dir)] = [st.st_mtime_ns, st.st_size]
+        return manifest
+
+    def _scan_known_words(self, dict_dir):
+        """遍历词库 JSON，收集所有已知词"""
+        known = set()
         for root, dirs, files in os.walk(dict_dir):
             for file in files:
                 if file.endswith('.json'):
+                    path = os.path.join(root, file)
                     try:
-                        with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
+                        with open(path, 'r', encoding='utf-8') as f:
                             data = json.load(f)
-                            if isinstance(data, dict):
-                                for val in data.values():
-                                    if isinstance(val, list):
-                                        for item in val:
-                                            if isinstance(item, dict) and 'char' in item:
-                                                known.add(item['char'])
-                                            elif isinstance(item, str):
-                                                known.add(item)
-                    except:
+                    except (OSError, ValueError) as e:
+                        print(f"跳过无法解析的词库 {path}: {e}")
                         continue
+                    if isinstance(data, dict):
+                        for val in data.values():
+                            if isinstance(val, list):
+                                for item in val:
+                                    if isinstance(item, dict) and 'char' in item:
+                                        known.add(item['char'])
+                                    elif isinstance(item, str):
+                                        known.add(item)
         return known
 
     def _read_content(self, file_path):
@@ -48,100 +418,493 @@ class NewWordDiscovery:
         
         elif ext == '.epub':
             print("正在原生解析 ePub 文件...")
-            content = []
             try:
-                with zipfile.ZipFile(file_path, 'r') as z:
-                    for name in z.namelist():
-                        if name.endswith(('.html', '.xhtml', '.htm')):
-                            with z.open(name) as f:
-                                html = f.read().decode('utf-8', errors='ignore')
-                                text = re.sub(r'<[^>]+>', '', html)
-                                content.append(text)
-                return "\n".join(content)
+                return "\n".join(self._iter_epub(file_path))
             except Exception as e:
                 return f"错误: 解析 ePub 失败 - {str(e)}"
         
         return ""
 
-    def _compute_entropy(self, counts):
-        """计算分布熵 (Entropy)，衡量词的自由度"""
-        if not counts:
-            return 0.0
-        total = sum(counts)
-        if total == 0:
-            return 0.0
-        entropy = 0.0
-        for c in counts:
-            p = c / total
-            entropy -= p * math.log2(p)
-        return entropy
-
-    def extract(self, file_path, output_path="discovered_words.json", max_word_len=4):
-        text = self._read_content(file_path)
-        if not text or text.startswith("错误"):
-            print(text or "读取文件为空")
-            return
+    def _iter_content(self, file_path, chunk_size=1 << 20):
+        """按块读取文件内容，避免整本书一次性进入内存"""
+        ext = os.path.splitext(file_path)[1].lower()
 
-        # 1. 预处理：按非汉字分割，避免跨句组合
-        print("正在预处理文本...")
-        sentences = re.split(r'[^\u4e00-\u9fa5]+', text)
-        sentences = [s for s in sentences if len(s) > 1]
-        
-        total_len = sum(len(s) for s in sentences)
-        if total_len == 0:
-            print("未提取到有效中文内容。")
-            return
-            
-        print(f"正在分析 {total_len} 个汉字，共 {len(sentences)} 个语句片段...")
-        
-        # 2. 统计 N-gram
+        if ext == '.txt':
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        elif ext == '.epub':
+            print("正在流式解析 ePub 文件...")
+            for text in self._iter_epub(file_path):
+                yield text
+                # 章节之间断句，与一次性读取时的 "\n".join 保持一致
+                yield "\n"
+
+    def _epub_spine(self, z):
+        """按 OPF 的 spine 返回正文文件的阅读顺序，缺少 OPF 时退回压缩包内顺序"""
+        names = set(z.namelist())
+        try:
+            container = ET.fromstring(z.read('META-INF/container.xml'))
+            opf_path = container.find('.//{*}rootfile').get('full-path')
+            opf = ET.fromstring(z.read(opf_path))
+        except (KeyError, AttributeError, ET.ParseError):
+            return [n for n in z.namelist() if n.endswith(('.html', '.xhtml', '.htm'))]
+
+        opf_dir = posixpath.dirname(opf_path)
+        hrefs = {}
+        for item in opf.iterfind('.//{*}manifest/{*}item'):
+            href = unquote(item.get('href', '')).split('#')[0]
+            hrefs[item.get('id')] = posixpath.normpath(posixpath.join(opf_dir, href))
+        spine = []
+        for ref in opf.iterfind('.//{*}spine/{*}itemref'):
+            name = hrefs.get(ref.get('idref'))
+            if name in names and name not in spine:
+                spine.append(name)
+        return spine
+
+    def _iter_epub(self, file_path, workers=4):
+        """按阅读顺序逐章产出 ePub 正文
+
+        解压、解码与去标签在线程池中进行，最多预取 workers * 2 章，
+        整本书不会同时驻留在内存中。
+        """
+        def load(name):
+            html = z.read(name).decode('utf-8', errors='ignore')
+            return re.sub(r'<[^>]+>', '', html)
+
+        with zipfile.ZipFile(file_path, 'r') as z, ThreadPoolExecutor(workers) as pool:
+            pending = deque()
+            for name in self._epub_spine(z):
+                pending.append(pool.submit(load, name))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _iter_sentences(self, chunks):
+        """将文本块切分为汉字语句片段，块尾未结束的片段并入下一块"""
+        carry = ""
+        for chunk in chunks:
+            parts = NON_HAN_RE.split(carry + chunk)
+            carry = parts.pop()
+            for s in parts:
+                if len(s) > 1:
+                    yield s
+        if len(carry) > 1:
+            yield carry
+
+    @staticmethod
+    def _count_ngrams(sentences, max_word_len, ngrams=None):
+        """统计 1..max_word_len+1 gram，返回 (ngrams, 汉字总数, 片段数)"""
+        if ngrams is None:
+            ngrams = Counter()
+        total_len = 0
+        n_sent = 0
         # 统计 max_word_len + 1 是为了计算 max_word_len 词的"下一步"可能性(右熵)
-        ngrams = Counter()
-        
         for sent in sentences:
             slen = len(sent)
+            total_len += slen
+            n_sent += 1
             for i in range(slen):
                 for n in range(1, max_word_len + 2):
                     if i + n <= slen:
                         ngrams[sent[i:i+n]] += 1
-        
-        # 3. 构建左右邻接分布 (用于计算熵)
+        return ngrams, total_len, n_sent
+
+    @staticmethod
+    def _count_spans(text, spans, max_word_len, ngrams=None):
+        """与 _count_ngrams 相同，但直接在原文上按 (starts, ends) 下标统计，不切出语句片段"""
+        if ngrams is None:
+            ngrams = Counter()
+        total_len = 0
+        n_sent = 0
+        for start, end in zip(*(a.tolist() for a in spans)):
+            total_len += end - start
+            n_sent += 1
+            for i in range(start, end):
+                for n in range(1, max_word_len + 2):
+                    if i + n <= end:
+                        ngrams[text[i:i+n]] += 1
+        return ngrams, total_len, n_sent
+
+    def _prune_ngrams(self, ngrams, target_size, floor):
+        """裁剪低频 N-gram 直到不超过 target_size，返回新的裁剪阈值
+
+        按阈值整体删除 (count <= floor)，保证子串计数始终不小于包含它的长串，
+        因此保留下来的候选词在计算 PMI 时仍能查到各切分部分。
+        """
+        while len(ngrams) > target_size:
+            floor += 1
+            for word in [w for w, c in ngrams.items() if c <= floor]:
+                del ngrams[word]
+        return floor
+
+    @staticmethod
+    def _pool_counts(batches, max_word_len, jobs):
+        """进程池按批统计 N-gram，按提交顺序产出 (部分计数表, 汉字数, 片段数)
+
+        最多同时有 2 * jobs 批在统计或等待归并，读取不会跑到归并前面太远，
+        内存占用与语料大小无关。
+        """
+        with Pool(jobs) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.apply_async(_count_chunk, ((batch, max_word_len),)))
+                if len(pending) >= 2 * jobs:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+
+    @staticmethod
+    def _sentence_batches(sentences, max_chars):
+        """把语句片段按约 max_chars 个汉字分批"""
+        batch = []
+        size = 0
+        for sent in sentences:
+            batch.append(sent)
+            size += len(sent)
+            if size >= max_chars:
+                yield batch
+                batch = []
+                size = 0
+        if batch:
+            yield batch
+
+    def _count_parallel(self, sentences, max_word_len, jobs):
+        """多进程统计：按 N-gram 首字分片计数，各分片的键互不相交
+
+        每个进程读全部语料，但只统计首字属于自己分片的片段，主进程不必
+        累加计数，只按各键首次出现的位置把分片拼接起来，键的插入顺序与
+        串行统计完全一致，因此同频词的输出顺序不变。分片数取 4 * jobs，
+        常用字集中在少数分片时各进程的负载仍大致均衡。
+        """
+        if not sentences:
+            return Counter(), 0, 0
+        n_shards = 4 * jobs
+        tasks = [(shard, n_shards, max_word_len) for shard in range(n_shards)]
+        with Pool(jobs, initializer=_init_shard_worker,
+                  initargs=('\n'.join(sentences),)) as pool:
+            shards = pool.map(_count_shard, tasks, chunksize=1)
+        return self._concat_shards(shards), sum(len(s) for s in sentences), len(sentences)
+
+    @staticmethod
+    def _concat_shards(shards):
+        """按首次出现位置拼接互不相交的分片计数表"""
+        if np is None:
+            merged = heapq.merge(*(zip(first, counts.items()) for counts, first in shards))
+            return Counter(dict(item for _, item in merged))
+        # 有 numpy 时整体排序一次位置，比逐项多路归并快一倍
+        first = np.concatenate([np.frombuffer(f, dtype=np.int64) for _, f in shards])
+        order = np.argsort(first).tolist()
+        words = list(chain.from_iterable(counts.keys() for counts, _ in shards))
+        counts = list(chain.from_iterable(counts.values() for counts, _ in shards))
+        return Counter(dict(zip(map(words.__getitem__, order), map(counts.__getitem__, order))))
+
+    @staticmethod
+    def _fold_counts(ngrams, partial, neighbors):
+        """把一批计数并入计数表，并按计数的新旧差值更新左右邻字累加器
+
+        累加器的键都是本批计数过的片段，并入后必定也在计数表中，之后随计数表
+        一起裁剪 (见 _prune_neighbors)。
+        """
+        right_neighbor_acc, left_neighbor_acc = neighbors
+        for word, dc in partial.items():
+            old = ngrams.get(word, 0)
+            new = old + dc
+            ngrams[word] = new
+            if len(word) < 3:
+                continue
+            dt = _clogc_delta(old, new)
+            for key, acc_map in ((word[:-1], right_neighbor_acc), (word[1:], left_neighbor_acc)):
+                acc = acc_map.get(key)
+                if acc is None:
+                    acc_map[key] = [dc, dt]
+                else:
+                    acc[0] += dc
+                    acc[1] += dt
+
+    @staticmethod
+    def _prune_neighbors(ngrams, neighbors):
+        """丢弃计数表中已被裁剪的片段的左右邻字累加器，累加器总大小随之受 max_ngrams 约束
+
+        被裁剪的片段计数不超过裁剪阈值，此后再次出现时计数与累加器都从 0 重新累计。
+        """
+        for acc_map in neighbors:
+            for key in [k for k in acc_map if k not in ngrams]:
+                del acc_map[key]
+
+    def _count_stream(self, file_paths, max_word_len, chunk_size, max_ngrams, jobs=1,
+                      with_neighbors=False):
+        """流式统计：依次按块读取各文件、逐批计数，计数表超过 max_ngrams 时裁剪低频项
+
+        返回 (计数表, 汉字数, 片段数, 裁剪阈值)，未裁剪时阈值为 0。所有文件
+        共用一张计数表与同一个裁剪阈值，语句片段不跨文件拼接。
+
+        每批约 max_ngrams / (8 * (max_word_len + 1)) 个汉字，一批最多新增
+        max_ngrams / 8 个键，裁剪不会因为单批过大而频繁触发。
+        jobs > 1 时各批次交给进程池计数，按读取顺序归并回主计数表；分批与
+        裁剪时机和单进程相同，因此结果也相同。
+        with_neighbors=True 时返回值多一项左右邻字累加器，未裁剪时为 None
+        (由完整计数表推导即可)。第一次裁剪前先由计数表建好累加器，之后每批
+        计数都先并入累加器再裁剪：裁剪时丢弃已不在计数表中的片段的累加器，
+        保留片段的低频邻字对熵的贡献不会丢失，累加器的键数也不超过计数表。
+        """
+        ngrams = Counter()
+        total_len = 0
+        n_sent = 0
+        floor = 0
+        neighbors = None
+        sentences = chain.from_iterable(self._iter_sentences(self._iter_content(path, chunk_size))
+                                        for path in file_paths)
+        batches = self._sentence_batches(sentences,
+                                         max(max_ngrams // (8 * (max_word_len + 1)), 1))
+        if jobs > 1:
+            partials = self._pool_counts(batches, max_word_len, jobs)
+        else:
+            # 建好累加器之后每批单独计数，才能知道各片段的新旧计数
+            partials = (self._count_ngrams(b, max_word_len,
+                                           ngrams if neighbors is None else None)
+                        for b in batches)
+        for partial, batch_len, batch_sent in partials:
+            if neighbors is not None:
+                self._fold_counts(ngrams, partial, neighbors)
+            elif partial is not ngrams:
+                ngrams.update(partial)
+            total_len += batch_len
+            n_sent += batch_sent
+            if len(ngrams) > max_ngrams:
+                if with_neighbors and neighbors is None:
+                    neighbors = self._build_neighbors(ngrams, min_count=1)
+                # 裁剪到一半容量，摊薄每次全表扫描的开销
+                before = len(ngrams)
+                floor = self._prune_ngrams(ngrams, max_ngrams // 2, floor)
+                if neighbors is not None:
+                    self._prune_neighbors(ngrams, neighbors)
+                self._emit('prune', removed=before - len(ngrams), floor=floor)
+            self._emit('progress', chars=total_len, sentences=n_sent, ngrams=len(ngrams))
+        if floor:
+            print(f"计数表已裁剪，出现次数 <= {floor} 的低频片段可能被低估")
+        if with_neighbors:
+            return ngrams, total_len, n_sent, floor, neighbors
+        return ngrams, total_len, n_sent, floor
+
+    def _count_suffix(self, sentences, max_word_len):
+        """后缀数组后端：整数编码语料，由相邻后缀区间推导 N-gram 计数与邻字分布
+
+        语料以 "\0" 连接后按 UTF-32 编码为 int32 码点数组，倍增法排序后缀
+        (只需排到 max_word_len + 1 字深度) 并计算截断 LCP。长度为 n 的同一
+        N-gram 在后缀数组中是一段 LCP >= n 的连续区间，只为每个不同的片段
+        生成一次字符串，而不是每次出现都切片。
+
+        返回 (ngrams, 汉字总数, 片段数, (右邻累加器, 左邻累加器))。ngrams 只含
+        计数不低于 min_count 的片段，键顺序与串行统计一致。
+        """
+        depth = max_word_len + 1
+        joined = "\0".join(sentences) + "\0" * depth
+        codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32).astype(np.int32)
+        size = len(codes)
+
+        # 1. 倍增法排序后缀：第 k 轮后 rank 表示前 2k 个字符的字典序
+        rank = codes.astype(np.int64)
+        k = 1
+        while k < depth:
+            shifted = np.zeros(size, dtype=np.int64)
+            shifted[:size - k] = rank[k:]
+            _, rank = np.unique(rank * (rank.max() + 1) + shifted, return_inverse=True)
+            k *= 2
+        sa = np.argsort(rank, kind='stable')
+        sa = sa[codes[sa] != 0]
+
+        # 2. 截断 LCP 与每个后缀到分隔符前的有效长度
+        lcp = np.zeros(len(sa), dtype=np.int32)
+        vlen = np.zeros(len(sa), dtype=np.int32)
+        same = np.ones(len(sa) - 1, dtype=bool)
+        alive = np.ones(len(sa), dtype=bool)
+        for d in range(depth):
+            cur = codes[sa + d]
+            alive &= cur != 0
+            vlen += alive
+            same &= (cur[1:] == cur[:-1]) & alive[1:]
+            lcp[1:] += same
+
+        # 3. 每个长度 n：LCP < n 处开启新区间，区间长度即出现次数
+        isa = np.empty(size, dtype=np.int64)
+        isa[sa] = np.arange(len(sa))
+        firsts, lengths, counts, prefix_of, suffix_of = [], [], [], [], []
+        gram_of_len = [None]   # gram_of_len[n][后缀数组下标] -> 全局片段编号
+        offset = 0
+        for n in range(1, depth + 1):
+            inc = vlen >= n
+            if not inc.any():
+                break
+            gid = np.cumsum(lcp < n) - 1
+            g = gid[inc]
+            bounds = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+            first = np.minimum.reduceat(sa[inc], bounds)
+            firsts.append(first)
+            lengths.append(np.full(len(bounds), n, dtype=np.int64))
+            counts.append(np.diff(np.r_[bounds, len(g)]))
+
+            index = np.full(len(sa), -1, dtype=np.int64)
+            index[inc] = offset + np.cumsum(np.r_[True, g[1:] != g[:-1]]) - 1
+            gram_of_len.append(index)
+            if n > 1:
+                prev = gram_of_len[n - 1]
+                prefix_of.append(prev[isa[first]])
+                suffix_of.append(prev[isa[first + 1]])
+            else:
+                prefix_of.append(np.full(len(bounds), -1, dtype=np.int64))
+                suffix_of.append(np.full(len(bounds), -1, dtype=np.int64))
+            offset += len(bounds)
+
+        first = np.concatenate(firsts)
+        length = np.concatenate(lengths)
+        count = np.concatenate(counts)
+        prefix_of = np.concatenate(prefix_of)
+        suffix_of = np.concatenate(suffix_of)
+
+        # 4. 按 (首次出现位置, 长度) 排序，复现串行 Counter 的插入顺序
+        # 低于 min_count 的片段既不是候选词，也不会是候选词的切分部分
+        # (子串计数不小于包含它的长串)，不必为它们生成字符串
+        order = np.lexsort((length, first))
+        ordered_count = count[order]
+        keep = ordered_count >= self.min_count
+        words = [joined[i:i + n] for i, n in zip(first[order][keep].tolist(),
+                                                 length[order][keep].tolist())]
+        ngrams = Counter(dict(zip(words, ordered_count[keep].tolist())))
+        word_index = np.cumsum(keep) - 1
+
+        # 5. 邻字累加器：同一前缀/后缀下 N+1 gram 的 (sum c, sum c*log2(c))
+        # 熵只会在候选词上计算，低于 min_count 或超长的片段无需累加
+        rank_of = np.empty(len(order), dtype=np.int64)
+        rank_of[order] = np.arange(len(order))
+        candidate = (count >= self.min_count) & (length >= 2) & (length <= max_word_len)
+        clogc = ordered_count * np.log2(ordered_count)
+        neighbors = []
+        for parent in (prefix_of[order], suffix_of[order]):
+            has = parent >= 0
+            has[has] = candidate[parent[has]]
+            keys = parent[has]
+            by_parent = np.argsort(keys, kind='stable')
+            keys = rank_of[keys[by_parent]]
+            starts = np.flatnonzero(np.r_[len(keys) > 0, keys[1:] != keys[:-1]])
+            sizes = np.diff(np.r_[starts, len(keys)])
+            totals = np.add.reduceat(ordered_count[has][by_parent], starts) if len(keys) else sizes
+            weighted = _sequential_segment_sums(clogc[has][by_parent], sizes)
+            neighbors.append({words[k]: [c, t] for k, c, t in zip(
+                word_index[keys[starts]].tolist(), totals.tolist(), weighted.tolist())})
+
+        total_len = sum(len(s) for s in sentences)
+        return ngrams, total_len, len(sentences), tuple(neighbors)
+
+    def _build_neighbors(self, ngrams, min_count=None):
+        """由 N+1 gram 推导左右邻字累加器 (用于计算熵)
+
+        每个键只保存 [sum c, sum c*log2(c)]，不再保留整条邻字计数列表；
+        熵只在候选词上计算，计数不足 min_count (默认 self.min_count) 的片段
+        直接跳过。
+        """
         # 只有左右搭配丰富的词，才是完整的词
-        right_neighbor_counts = {} # key: word, value: list of counts
-        left_neighbor_counts = {}  # key: word, value: list of counts
-        
+        right_neighbor_acc = {} # key: word, value: [sum c, sum c*log2(c)]
+        left_neighbor_acc = {}  # key: word, value: [sum c, sum c*log2(c)]
+        if min_count is None:
+            min_count = self.min_count
+
         # 利用 N+1 gram 来推导 N gram 的邻字分布
         for word, count in ngrams.items():
-            wlen = len(word)
-            if wlen < 2: continue
-            
+            # 单字永远不是候选词，长度为 2 的片段无需为其前后缀累加
+            if len(word) < 3: continue
+            clogc = count * math.log2(count)
+
             # Case 1: Word = Prefix + NextChar
             # "ABC" 的出现证明了 "AB" 后面可以接 "C"
             prefix = word[:-1]
-            if prefix in ngrams: 
-                if prefix not in right_neighbor_counts: right_neighbor_counts[prefix] = []
-                right_neighbor_counts[prefix].append(count)
-                
+            if ngrams.get(prefix, 0) >= min_count:
+                acc = right_neighbor_acc.get(prefix)
+                if acc is None:
+                    right_neighbor_acc[prefix] = [count, clogc]
+                else:
+                    acc[0] += count
+                    acc[1] += clogc
+
             # Case 2: Word = PrevChar + Suffix
             # "ABC" 的出现证明了 "BC" 前面可以接 "A"
             suffix = word[1:]
-            if suffix in ngrams:
-                if suffix not in left_neighbor_counts: left_neighbor_counts[suffix] = []
-                left_neighbor_counts[suffix].append(count)
+            if ngrams.get(suffix, 0) >= min_count:
+                acc = left_neighbor_acc.get(suffix)
+                if acc is None:
+                    left_neighbor_acc[suffix] = [count, clogc]
+                else:
+                    acc[0] += count
+                    acc[1] += clogc
 
-        # 4. 筛选与评分
+        return right_neighbor_acc, left_neighbor_acc
+
+    def _compute_entropy(self, acc):
+        """由累加器计算分布熵 (Entropy)，衡量词的自由度
+
+        H = -sum(p*log2(p)) = log2(S) - sum(c*log2(c)) / S，其中 S = sum(c)
+        """
+        if not acc:
+            return 0.0
+        total, clogc = acc
+        if total == 0:
+            return 0.0
+        return max(math.log2(total) - clogc / total, 0.0)
+
+    # 以下两个筛选条件对标量与 numpy 数组都适用，_score、_score_vectorized
+    # 与 update 共用，保证三条路径的取舍完全一致
+    def _pmi_ok(self, pmi):
+        return pmi >= self.min_pmi
+
+    def _entropy_ok(self, entropy):
+        return entropy >= self.min_entropy
+
+    @staticmethod
+    def _record(count, pmi, entropy):
+        """通过筛选的新词的输出记录"""
+        return {
+            "count": count,
+            "pmi": round(pmi, 2),
+            "entropy": round(entropy, 2)
+        }
+
+    def _score(self, ngrams, total_len, max_word_len, right_neighbor_acc, left_neighbor_acc,
+               stats=None, top_k=None, sink=None):
+        """逐个候选词计算凝固度与自由度，返回通过筛选的 {词: 指标}
+
+        传入 stats 字典时写入候选数及各筛选条件淘汰的数量。
+        top_k 时用小顶堆保留词频最高的 top_k 个词，堆满后词频不超过堆顶的
+        候选词直接跳过，不再计算 PMI 与熵。同频词按出现顺序取舍，结果与
+        完整输出的前 top_k 项相同。
+        传入 sink 且不限 top_k 时，每个通过筛选的词立即交给 sink(word, 指标)，
+        返回空字典。
+        """
+        known_words = self._known_lookup(len(ngrams))
         results = {}
-        print("正在计算凝固度(PMI)与自由度(Entropy)...")
-        
-        for word, count in ngrams.items():
+        kept = 0
+        heap = []  # (count, -出现顺序, word)，堆顶是当前最差的入选词
+        candidates = pruned_count = pruned_known = pruned_pmi = pruned_entropy = pruned_top_k = 0
+        for index, (word, count) in enumerate(ngrams.items()):
             wlen = len(word)
             if wlen < 2 or wlen > max_word_len:
                 continue
+            candidates += 1
             
             if count < self.min_count:
+                pruned_count += 1
+                continue
+
+            if top_k and len(heap) >= top_k and count <= heap[0][0]:
+                pruned_top_k += 1
                 continue
             
-            if word in self.known_words:
+            if word in known_words:
+                pruned_known += 1
                 continue
                 
             # --- 算法核心 1: 凝固度 (PMI) ---
@@ -163,7 +926,8 @@ class NewWordDiscovery:
                     if pmi < min_pmi:
                         min_pmi = pmi
             
-            if min_pmi < self.min_pmi:
+            if not self._pmi_ok(min_pmi):
+                pruned_pmi += 1
                 continue
                 
             # --- 算法核心 2: 自由度 (Entropy) ---
@@ -171,36 +935,790 @@ class NewWordDiscovery:
             # "血红蛋" 右边总是 "白"，右熵低 -> 过滤
             # "化道" 左边总是 "消"，左熵低 -> 过滤
             
-            r_entropy = self._compute_entropy(right_neighbor_counts.get(word, []))
-            l_entropy = self._compute_entropy(left_neighbor_counts.get(word, []))
+            r_entropy = self._compute_entropy(right_neighbor_acc.get(word))
+            l_entropy = self._compute_entropy(left_neighbor_acc.get(word))
             
             # 取左右熵的较小值，要求两边都比较自由
             min_entropy_val = min(r_entropy, l_entropy)
-            if min_entropy_val < self.min_entropy:
+            if not self._entropy_ok(min_entropy_val):
+                pruned_entropy += 1
                 continue
                 
-            results[word] = {
-                "count": count,
-                "pmi": round(min_pmi, 2),
-                "entropy": round(min_entropy_val, 2)
-            }
-        
-        # 5. 保存结果
-        sorted_results = dict(sorted(results.items(), key=lambda x: x[1]['count'], reverse=True))
-        
+            record = self._record(count, min_pmi, min_entropy_val)
+            if sink is not None and not top_k:
+                sink(word, record)
+                kept += 1
+                continue
+            results[word] = record
+            if top_k:
+                if len(heap) < top_k:
+                    heapq.heappush(heap, (count, -index, word))
+                else:
+                    del results[heapq.heappushpop(heap, (count, -index, word))[2]]
+                    pruned_top_k += 1
+        if stats is not None:
+            stats.update(candidates=candidates, pruned_count=pruned_count,
+                         pruned_known=pruned_known, pruned_pmi=pruned_pmi,
+                         pruned_entropy=pruned_entropy, pruned_top_k=pruned_top_k,
+                         kept=kept + len(results))
+        return results
+
+    def _score_vectorized(self, ngrams, total_len, max_word_len,
+                          right_neighbor_acc, left_neighbor_acc, stats=None, top_k=None,
+                          sink=None):
+        """批量评分：计数、切分部分与邻字累加器都由整数下标批量查出，结果与 _score 一致
+
+        片段编码为码点矩阵，每行打包成一个整数键后排序；切分部分由矩阵按列
+        截取/平移得到，再用 searchsorted 批量查出计数与邻字累加器。只有判断
+        已知词时逐词查集合。
+        """
+        known_words = self._known_lookup(len(ngrams))
+        words = list(ngrams)
+        counts = np.fromiter(ngrams.values(), dtype=np.int64, count=len(words))
+        lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+
+        # 候选词与切分部分都不超过 max_word_len 个字，更长的片段不必进查找表
+        in_table = np.flatnonzero(lengths <= max_word_len)
+        rows, _ = _word_rows([words[i] for i in in_table.tolist()], max_word_len)
+        count_table = _RowTable(rows, counts[in_table])
+
+        is_candidate = lengths[in_table] >= 2
+        enough = counts[in_table] >= self.min_count
+        cand = np.flatnonzero(is_candidate & enough)
+        cand_words = [words[i] for i in in_table[cand].tolist()]
+        known = np.fromiter((w in known_words for w in cand_words), dtype=bool,
+                            count=len(cand_words))
+        cand = cand[~known]
+        cand_words = [w for w, k in zip(cand_words, known.tolist()) if not k]
+
+        if stats is not None:
+            stats.update(candidates=int(is_candidate.sum()),
+                         pruned_count=int((is_candidate & ~enough).sum()),
+                         pruned_known=int(known.sum()), pruned_pmi=0, pruned_entropy=0,
+                         pruned_top_k=0, kept=0)
+        if not len(cand):
+            return {}
+
+        # 按查找表的键序处理候选词：前半部分与邻字累加器的查询键随之有序，
+        # 查找前的排序近乎线性；算完再按 slot 放回候选词原来的位置
+        is_cand = np.zeros(len(in_table), dtype=bool)
+        is_cand[cand] = True
+        by_key = count_table.order[is_cand[count_table.order]]
+        slot = np.empty(len(in_table), dtype=np.intp)
+        slot[cand] = np.arange(len(cand))
+        slot = slot[by_key]
+        cand_counts = counts[in_table][cand]
+
+        # 切分点 k：前半部分保留前 k 列，后半部分左移 k 列；超出词长的切分点记 0
+        cand_rows = rows[by_key]
+        split_len = lengths[in_table][by_key]
+        parts = np.zeros((len(cand), max(max_word_len - 1, 1), 2), dtype=np.int64)
+        for k in range(1, max_word_len):
+            split = split_len > k
+            left_rows = np.zeros_like(cand_rows)
+            left_rows[:, :k] = cand_rows[:, :k]
+            right_rows = np.zeros_like(cand_rows)
+            right_rows[:, :max_word_len - k] = cand_rows[:, k:]
+            parts[slot, k - 1, 0] = np.where(split, count_table.get(left_rows), 0)
+            parts[slot, k - 1, 1] = np.where(split, count_table.get(right_rows), 0)
+
+        accs = []
+        for acc_map in (right_neighbor_acc, left_neighbor_acc):
+            acc = np.zeros((len(cand), 2))
+            if acc_map:
+                acc_rows, _ = _word_rows(list(acc_map), max_word_len)
+                acc_values = np.fromiter(chain.from_iterable(acc_map.values()),
+                                         dtype=np.float64,
+                                         count=2 * len(acc_map)).reshape(-1, 2)
+                acc[slot] = _RowTable(acc_rows, acc_values).get(cand_rows, 0.0)
+            accs.append(acc)
+
+        pmi, entropy = _batch_scores(cand_counts, parts, accs[0], accs[1], total_len)
+        pmi_ok = self._pmi_ok(pmi)
+        keep = pmi_ok & self._entropy_ok(entropy)
+        selected = np.flatnonzero(keep)
+        if top_k and len(selected) > top_k:
+            # 稳定排序保证同频词按出现顺序取舍，再按原顺序输出
+            best = np.argsort(-cand_counts[selected], kind='stable')[:top_k]
+            selected = np.sort(selected[best])
+        if stats is not None:
+            stats.update(pruned_pmi=int((~pmi_ok).sum()),
+                         pruned_entropy=int((pmi_ok & ~keep).sum()),
+                         pruned_top_k=int(keep.sum()) - len(selected), kept=len(selected))
+        results = {}
+        for i, count, p, e in zip(selected.tolist(), cand_counts[selected].tolist(),
+                                  pmi[selected].tolist(), entropy[selected].tolist()):
+            record = self._record(count, p, e)
+            if sink is not None and not top_k:
+                sink(cand_words[i], record)
+            else:
+                results[cand_words[i]] = record
+        return results
+
+    def extract(self, file_path, output_path="discovered_words.json", max_word_len=4,
+                streaming=False, chunk_size=1 << 20, max_ngrams=5000000, jobs=1,
+                backend='counter', vectorized=False, top_k=None, output_format=None):
+        """发现新词并保存为 JSON
+
+        streaming=True 时按 chunk_size 分块读取，计数表最多保留 max_ngrams 项；
+        语料足够小、未触发裁剪时结果与默认模式一致。裁剪后低频片段的计数
+        可能被低估；左右邻字累加器随计数表一起裁剪，内存占用与语料大小无关。
+        jobs > 1 时使用多进程统计 N-gram，输出与同一模式下的单进程完全相同
+        (流式模式下两者的分批与裁剪时机一致)。
+        backend='suffix' 使用基于 numpy 的后缀数组统计，适合 max_word_len > 4；
+        该后端总是单进程统计，忽略 jobs。
+        vectorized=True 时用 numpy 批量计算 PMI 与熵，适合百万级候选词表。
+        top_k 只输出词频最高的 top_k 个新词。
+        output_format 为 'json' (带缩进、按词频排序) 或 'jsonl' (每行一条记录)，
+        默认按输出文件扩展名判断；jsonl 且不限 top_k 时边评分边写出，顺序为
+        评分顺序而非词频顺序。
+        加载了背景模型时，结果附带 llr 字段，并按 llr 而不是词频排序与截取 top_k。
+        """
+        if (backend == 'suffix' or vectorized) and np is None:
+            print("错误: 后缀数组后端与批量评分需要安装 numpy")
+            return
+        if backend == 'suffix':
+            if streaming:
+                print("错误: 后缀数组后端需要完整语料，不支持流式模式")
+                return
+            if jobs > 1:
+                print("警告: 后缀数组后端只支持单进程统计，忽略 jobs")
+
+        neighbors = None
+        if not self._check_background(max_word_len):
+            return
+        run_start = time.perf_counter()
+        if streaming:
+            print("正在流式统计文本...")
+            with self._stage('count') as info:
+                try:
+                    ngrams, total_len, n_sent, _, neighbors = self._count_stream(
+                        [file_path], max_word_len, chunk_size, max_ngrams, jobs,
+                        with_neighbors=True)
+                except Exception as e:
+                    print(f"错误: 读取文件失败 - {str(e)}")
+                    return
+                info.update(ngrams=len(ngrams), chars=total_len, sentences=n_sent)
+        else:
+            with self._stage('split') as info:
+                text = self._read_content(file_path)
+                if not text or text.startswith("错误"):
+                    print(text or "读取文件为空")
+                    return
+
+                # 1. 预处理：按非汉字分割，避免跨句组合
+                print("正在预处理文本...")
+                spans = None
+                if np is not None and backend == 'counter' and jobs == 1:
+                    # 串行计数直接使用原文下标，免去数百万个片段字符串
+                    spans = _han_spans(text)
+                    info.update(sentences=len(spans[0]))
+                else:
+                    sentences = NON_HAN_RE.split(text)
+                    sentences = [s for s in sentences if len(s) > 1]
+                    del text
+                    info.update(sentences=len(sentences))
+
+            # 2. 统计 N-gram
+            with self._stage('count') as info:
+                if spans is not None:
+                    ngrams, total_len, n_sent = self._count_spans(text, spans, max_word_len)
+                    del text, spans
+                elif backend == 'suffix' and sentences:
+                    ngrams, total_len, n_sent, neighbors = self._count_suffix(sentences, max_word_len)
+                elif jobs > 1:
+                    ngrams, total_len, n_sent = self._count_parallel(sentences, max_word_len, jobs)
+                else:
+                    ngrams, total_len, n_sent = self._count_ngrams(sentences, max_word_len)
+                info.update(ngrams=len(ngrams), chars=total_len)
+                if self.on_event is not None:
+                    info.update(ngram_occurrences=sum(ngrams.values()))
+
+        if total_len == 0:
+            print("未提取到有效中文内容。")
+            return
+
+        print(f"正在分析 {total_len} 个汉字，共 {n_sent} 个语句片段...")
+
+        # 3. 构建左右邻接分布 (用于计算熵)
+        with self._stage('neighbors') as info:
+            if neighbors is None:
+                neighbors = self._build_neighbors(ngrams)
+            right_neighbor_acc, left_neighbor_acc = neighbors
+            info.update(right_keys=len(right_neighbor_acc), left_keys=len(left_neighbor_acc))
+
+            # 邻字累加器建好后，低于 min_count 的片段不再需要：它们既不是候选词，
+            # 也不会是候选词的切分部分，提前丢弃以缩小评分循环并释放内存
+            before = len(ngrams)
+            ngrams = Counter({w: c for w, c in ngrams.items() if c >= self.min_count})
+            info.update(pruned_rare=before - len(ngrams))
+
+        # 4. 筛选与评分
+        print("正在计算凝固度(PMI)与自由度(Entropy)...")
+        output_format = output_format or self._output_format(output_path)
+        score = self._score_vectorized if vectorized else self._score
+        if output_format == 'jsonl' and not top_k:
+            # 4+5. 流式输出：通过筛选的词直接写入文件
+            with self._stage('score') as info:
+                try:
+                    with open(output_path, 'w', encoding='utf-8') as f:
+                        sink = JsonLinesSink(f)
+                        score(ngrams, total_len, max_word_len, right_neighbor_acc,
+                              left_neighbor_acc, stats=info,
+                              sink=self._contrast_sink(sink, total_len))
+                except OSError as e:
+                    print(f"保存结果失败: {e}")
+                    return
+            print(f"成功！发现 {sink.count} 个新词，已保存至: {output_path}")
+            n_results = sink.count
+        else:
+            with self._stage('score') as info:
+                results = score(ngrams, total_len, max_word_len, right_neighbor_acc,
+                                left_neighbor_acc, stats=info,
+                                top_k=None if self.background else top_k)
+            if self.background:
+                with self._stage('contrast') as info:
+                    results = self._contrast(results, total_len, top_k)
+                    info.update(results=len(results))
+
+            # 5. 保存结果
+            with self._stage('dump') as info:
+                self._save_results(results, output_path, output_format)
+                info.update(results=len(results))
+            n_results = len(results)
+        self._emit('summary', seconds=round(time.perf_counter() - run_start, 4),
+                   chars=total_len, ngrams=len(ngrams), results=n_results)
+
+    def _output_format(self, output_path):
+        """按扩展名推断输出格式：.jsonl 为 JSON Lines，其余为带缩进的 JSON"""
+        return 'jsonl' if output_path.lower().endswith('.jsonl') else 'json'
+
+    def _check_background(self, max_word_len):
+        if self.background and self.background.max_word_len < max_word_len:
+            print(f"错误: 背景模型只统计到 {self.background.max_word_len} 字片段，"
+                  f"小于 max_word_len={max_word_len}")
+            return False
+        return True
+
+    def _contrast_record(self, word, record, total_len):
+        """与背景模型对比：领域语料中不显著偏多的片段返回 None，否则附加 llr
+
+        背景模型未收录的片段按其可能的最大计数 (BackgroundModel.missing_count) 计。
+        """
+        bg = self.background
+        bg_count = bg.count(word)
+        count = record['count']
+        if count * bg.total_len <= bg_count * total_len:
+            return None
+        llr = _log_likelihood(count, total_len, bg_count, bg.total_len)
+        if llr < self.min_llr:
+            return None
+        return dict(record, llr=round(llr, 2))
+
+    def _contrast_sink(self, sink, total_len):
+        """给流式输出包一层背景对比过滤；未加载背景模型时原样返回"""
+        if self.background is None:
+            return sink
+
+        def contrasted(word, record):
+            record = self._contrast_record(word, record, total_len)
+            if record is not None:
+                sink(word, record)
+        return contrasted
+
+    def _contrast(self, results, total_len, top_k=None):
+        """按背景模型过滤结果，top_k 按 llr 截取"""
+        contrasted = {}
+        for word, record in results.items():
+            record = self._contrast_record(word, record, total_len)
+            if record is not None:
+                contrasted[word] = record
+        if top_k:
+            contrasted = dict(heapq.nlargest(top_k, contrasted.items(), key=lambda x: x[1]['llr']))
+        return contrasted
+
+    def build_background(self, file_paths, model_path, max_word_len=4, min_count=2,
+                         max_ngrams=5000000):
+        """统计背景语料，生成 BackgroundModel 文件
+
+        全部文件计入同一张不超过 max_ngrams 项的计数表。只保存出现不少于
+        min_count 次的片段，min_count 与裁剪阈值都记入 manifest；未收录的片段
+        在对比时按可能的最大计数 max(裁剪阈值, min_count - 1) 计，不会因为
+        计数没有收录而高估 llr。
+        """
+        manifest_files = {}
+        with self._stage('count') as info:
+            print(f"正在统计背景语料: {', '.join(file_paths)}")
+            try:
+                for path in file_paths:
+                    st = os.stat(path)
+                    manifest_files[os.path.abspath(path)] = [st.st_mtime_ns, st.st_size]
+                ngrams, total_len, _, floor = self._count_stream(file_paths, max_word_len - 1,
+                                                                 1 << 20, max_ngrams)
+            except Exception as e:
+                print(f"错误: 读取文件失败 - {str(e)}")
+                return
+            info.update(ngrams=len(ngrams), chars=total_len, floor=floor)
+
+        if total_len == 0:
+            print("未提取到有效中文内容。")
+            return
+        if floor >= min_count:
+            print(f"警告: 计数表裁剪阈值 {floor} 不小于 min_count={min_count}，"
+                  f"未收录的片段在对比时按 {floor} 次计")
+        kept = {w: c for w, c in ngrams.items() if c >= min_count}
+        manifest = {'files': manifest_files, 'total_len': total_len,
+                    'max_word_len': max_word_len, 'min_count': min_count, 'floor': floor}
+        with self._stage('dump') as info:
+            try:
+                BackgroundModel.build(model_path, kept, manifest)
+            except OSError as e:
+                print(f"保存背景模型失败: {e}")
+                return
+            info.update(ngrams=len(kept))
+        print(f"背景模型已保存至: {model_path} (汉字 {total_len} 个，片段 {len(kept)} 个)")
+
+    def _save_results(self, results, output_path, output_format=None):
+        """按词频 (对比模式下按 llr) 降序保存结果"""
+        output_format = output_format or self._output_format(output_path)
+        rank = 'llr' if self.background else 'count'
+        sorted_items = sorted(results.items(), key=lambda x: x[1][rank], reverse=True)
+
         try:
             with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(sorted_results, f, ensure_ascii=False, indent=2)
-            print(f"成功！发现 {len(sorted_results)} 个新词，已保存至: {output_path}")
+                if output_format == 'jsonl':
+                    sink = JsonLinesSink(f)
+                    for word, record in sorted_items:
+                        sink(word, record)
+                else:
+                    json.dump(dict(sorted_items), f, ensure_ascii=False, indent=2)
+            print(f"成功！发现 {len(sorted_items)} 个新词，已保存至: {output_path}")
         except Exception as e:
             print(f"保存结果失败: {e}")
 
+    def _new_state(self, max_word_len):
+        """空的发现状态：尚无基表，全部片段都在内存中的增量条目里"""
+        return {
+            'table': None,
+            'generation': 0,
+            'max_word_len': max_word_len,
+            'min_count': self.min_count,
+            'total_len': 0,
+            'n_sent': 0,
+            'next_seq': 0,   # 下一个新片段的首次出现序号
+            'ngrams': 0,     # 片段总数
+            'floor': 0,      # 压缩时的裁剪阈值
+            'entries': {},   # 上次压缩后改动过的片段: {片段: 条目}，优先于基表
+            'scores': {},    # 候选词: [count, c1, c2, entropy, seq]
+            'unigrams': {},  # 单字计数，单字是几乎所有候选词的切分部分
+            'index': {},     # 切分部分 -> 以它为切分部分的候选词
+            'journal_size': 0,
+        }
+
+    def _load_state(self, state_path):
+        """打开基表并重放日志，状态文件不存在时返回 None
+
+        基表只做内存映射，不读入全部片段；日志中世代号与基表不符的记录是
+        压缩前留下的，已并入基表，直接忽略。
+        """
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path, 'rb') as f:
+            if f.read(4) != StateTable.MAGIC:
+                raise ValueError("状态文件格式不兼容，请删除后重新生成")
+        table = StateTable(state_path)
+        extra = table.extra()
+        state = self._new_state(table.manifest['max_word_len'])
+        state.update(table.manifest)
+        state.update(table=table, scores=extra['scores'], unigrams=extra['unigrams'],
+                     index=extra['index'])
+        self._replay_journal(state, state_path + '.journal')
+        return state
+
+    def _replay_journal(self, state, journal_path):
+        """依次应用日志记录；末尾写了一半的记录 (更新中断) 丢弃"""
+        size = 0
+        try:
+            f = open(journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                data = f.read(struct.unpack('=Q', header)[0])
+                try:
+                    record = pickle.loads(data)
+                except Exception:
+                    break
+                if record['generation'] != state['generation']:
+                    break
+                self._apply_record(state, record)
+                size = f.tell()
+        state['journal_size'] = size
+
+    def _apply_record(self, state, record):
+        """把一条日志记录并入内存中的状态"""
+        state['entries'].update(record['entries'])
+        for word, entry in record['entries'].items():
+            if len(word) == 1:
+                state['unigrams'][word] = entry[0]
+        scores = state['scores']
+        for word, score in record['scores'].items():
+            if word not in scores:
+                self._index_candidate(state['index'], word)
+            scores[word] = score
+        for key in ('total_len', 'n_sent', 'next_seq', 'ngrams'):
+            state[key] = record[key]
+
+    @staticmethod
+    def _index_candidate(index, word):
+        """把候选词登记到各切分部分的反向索引下"""
+        for k in range(1, len(word)):
+            index.setdefault(word[:k], []).append(word)
+            index.setdefault(word[k:], []).append(word)
+
+    def _state_entry(self, state, word):
+        """查片段条目：先查改动过的条目，再查基表"""
+        entry = state['entries'].get(word)
+        if entry is None and state['table'] is not None:
+            entry = state['table'].entry(word)
+        return entry
+
+    def _state_count(self, state, word):
+        """查片段计数：候选词与单字的计数都在内存中，一般不必查基表"""
+        entry = state['entries'].get(word)
+        if entry is not None:
+            return entry[0]
+        if len(word) == 1:
+            return state['unigrams'].get(word, 0)
+        score = state['scores'].get(word)
+        if score is not None:
+            return score[0]
+        entry = self._state_entry(state, word)
+        return entry[0] if entry else 0
+
+    def _merge_delta(self, state, delta):
+        """把新文本的计数并入状态，同时增量更新左右邻字累加器
+
+        只查询新文本中出现的片段，改动过的条目留在 state['entries'] 中。
+        """
+        entries = state['entries']
+        grown = []
+        for word, dc in delta.items():
+            entry = entries.get(word)
+            if entry is None:
+                entry = self._state_entry(state, word)
+                if entry is None:
+                    # 新片段按出现顺序编号，输出时同频词的先后与一次性统计相同
+                    entry = [0, state['next_seq'], 0, 0.0, 0, 0.0]
+                    state['next_seq'] += 1
+                    state['ngrams'] += 1
+                entries[word] = entry
+            old = entry[0]
+            entry[0] = old + dc
+            if len(word) == 1:
+                state['unigrams'][word] = entry[0]
+            elif len(word) >= 3:
+                grown.append((word, old, entry[0]))
+
+        # 片段的前后缀也都在新文本中出现过，此时已在 entries 里
+        for word, old, new in grown:
+            dc = new - old
+            dt = _clogc_delta(old, new)
+            right = entries[word[:-1]]
+            right[2] += dc
+            right[3] += dt
+            left = entries[word[1:]]
+            left[4] += dc
+            left[5] += dt
+
+    def _affected(self, state, delta, max_word_len):
+        """受影响的候选词：新文本中计数达标的片段，以及反向索引中以新片段为切分部分的候选词"""
+        entries = state['entries']
+        index = state['index']
+        min_count = self.min_count
+        affected = set()
+        for word in delta:
+            if 2 <= len(word) <= max_word_len and entries[word][0] >= min_count:
+                affected.add(word)
+            if len(word) < max_word_len:
+                affected.update(index.get(word, ()))
+        return affected
+
+    def _rescore_state(self, state, words):
+        """重新计算给定片段的 [count, c1, c2, entropy, seq]
+
+        (c1, c2) 记录 PMI 最小的切分点两侧计数。最小切分点与语料总长无关，
+        因此未受影响的候选词在总长变化后仍可直接由它算出 PMI。只因切分部分
+        变化而受影响的候选词，邻字累加器未变，沿用原来的熵。
+        """
+        scores = state['scores']
+        for word in words:
+            entry = state['entries'].get(word)
+            old = scores.get(word)
+            if entry is None and old is None:
+                entry = self._state_entry(state, word)
+                if entry is None:
+                    continue
+            if entry is not None:
+                count, seq = entry[0], entry[1]
+                entropy = min(self._compute_entropy((entry[2], entry[3])),
+                              self._compute_entropy((entry[4], entry[5])))
+            else:
+                count, _, _, entropy, seq = old
+            if count < self.min_count:
+                scores.pop(word, None)
+                continue
+            best = (float('inf'), 0, 0)
+            for k in range(1, len(word)):
+                c1 = self._state_count(state, word[:k])
+                c2 = self._state_count(state, word[k:])
+                if c1 > 0 and c2 > 0:
+                    ratio = count / (c1 * c2)
+                    if ratio < best[0]:
+                        best = (ratio, c1, c2)
+            if old is None:
+                self._index_candidate(state['index'], word)
+            scores[word] = [count, best[1], best[2], entropy, seq]
+
+    def _compact_state(self, state, state_path, max_ngrams, rescore=False):
+        """把基表与改动过的条目合并后整体重写基表，并清空日志
+
+        片段数超过 max_ngrams 时像流式模式一样裁剪低频片段；被裁掉的片段
+        以后再出现时从 0 重新计数，计数可能被低估，邻字累加器也会略有偏差。
+        """
+        table = state['table']
+        entries = state['entries']
+        if table is not None:
+            for word, entry in table.items():
+                entries.setdefault(word, entry)
+            table.close()
+        state['table'] = None
+
+        if max_ngrams and len(entries) > max_ngrams:
+            counts = Counter({w: e[0] for w, e in entries.items()})
+            floor = self._prune_ngrams(counts, max_ngrams // 2, state['floor'])
+            self._emit('prune', removed=len(entries) - len(counts), floor=floor)
+            # 保留下来的片段的邻字累加器仍包含被裁掉的邻字，熵不受裁剪影响
+            entries = state['entries'] = {w: entries[w] for w in counts}
+            scores = {w: s for w, s in state['scores'].items() if w in entries}
+            index = {}
+            for word in scores:
+                self._index_candidate(index, word)
+            state.update(scores=scores, index=index, floor=floor,
+                         unigrams={w: c for w, c in state['unigrams'].items() if w in entries})
+
+        if rescore:
+            max_word_len = state['max_word_len']
+            state.update(scores={}, index={},
+                         unigrams={w: e[0] for w, e in entries.items() if len(w) == 1})
+            self._rescore_state(state, [w for w in entries if 2 <= len(w) <= max_word_len])
+
+        state['generation'] += 1
+        state['ngrams'] = len(entries)
+        manifest = {key: state[key] for key in ('generation', 'max_word_len', 'min_count',
+                                                'total_len', 'n_sent', 'next_seq', 'ngrams',
+                                                'floor')}
+        StateTable.build(state_path, entries, manifest,
+                         {'scores': state['scores'], 'unigrams': state['unigrams'],
+                          'index': state['index']})
+        # 基表替换后旧日志的世代号已过期，即使删除前中断也不会被重放
+        try:
+            os.remove(state_path + '.journal')
+        except FileNotFoundError:
+            pass
+        state['entries'] = {}
+        state['journal_size'] = 0
+
+    def _save_state(self, state, state_path, delta, affected, max_ngrams, rescore=False):
+        """把本次更新追加到日志；日志超过基表的 1/4 或需要裁剪、全量重评时改为压缩
+
+        返回是否做了压缩。
+        """
+        table = state['table']
+        compact = rescore or table is None
+        if not compact:
+            n_new = state['next_seq'] - table.manifest['next_seq']
+            compact = bool(max_ngrams) and len(table) + n_new > max_ngrams
+        if not compact:
+            record = {
+                'generation': state['generation'],
+                'entries': {w: state['entries'][w] for w in delta},
+                'scores': {w: state['scores'][w] for w in affected if w in state['scores']},
+            }
+            for key in ('total_len', 'n_sent', 'next_seq', 'ngrams'):
+                record[key] = state[key]
+            data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+            size = state['journal_size'] + 8 + len(data)
+            compact = size > os.path.getsize(state_path) // 4
+        if compact:
+            self._compact_state(state, state_path, max_ngrams, rescore)
+            return True
+        with open(state_path + '.journal', 'ab') as f:
+            # 丢弃重放时发现的半条记录，再追加本次记录
+            f.truncate(state['journal_size'])
+            f.write(struct.pack('=Q', len(data)) + data)
+        state['journal_size'] = size
+        return False
+
+    def update(self, file_paths, state_path, output_path="discovered_words.json", max_word_len=4,
+               top_k=None, output_format=None, max_ngrams=5000000):
+        """增量发现：把新文档并入持久化状态，只重新评分受影响的候选词
+
+        状态由两部分组成：state_path 是内存映射的基表 (StateTable)，保存全部
+        N-gram 的计数与左右邻字累加器以及候选词的评分要素；state_path +
+        '.journal' 是追加写入的日志，每次更新只追加新文本中出现的片段和
+        重新评分的候选词。加载时只读入候选词评分与日志，其余片段按需在基表
+        中二分查找；日志超过基表的 1/4 时才合并重写基表。受影响的候选词由
+        切分部分的反向索引查出，耗时与新增文本量及其波及的候选词数相当，
+        而不是整个语料库。
+        首次调用 (状态文件不存在) 等价于对这些文件做一次完整统计。片段数
+        超过 max_ngrams 时在压缩时裁剪低频片段，状态大小因此有上限；裁剪
+        后低频片段的计数可能被低估，与流式模式相同。
+        """
+        if not self._check_background(max_word_len):
+            return
+        run_start = time.perf_counter()
+        with self._stage('load_state'):
+            try:
+                state = self._load_state(state_path)
+            except Exception as e:
+                print(f"错误: 读取状态文件失败 - {str(e)}")
+                return
+        if state is None:
+            state = self._new_state(max_word_len)
+        elif state['max_word_len'] != max_word_len:
+            print(f"错误: 状态文件的 max_word_len 为 {state['max_word_len']}，与本次参数不一致")
+            return
+
+        # 1. 只统计新增文本
+        delta = Counter()
+        delta_len = 0
+        delta_sent = 0
+        with self._stage('count') as info:
+            for path in file_paths:
+                print(f"正在统计新增文本: {path}")
+                try:
+                    sentences = self._iter_sentences(self._iter_content(path))
+                    _, n_chars, n_sent = self._count_ngrams(sentences, max_word_len, delta)
+                except Exception as e:
+                    print(f"错误: 读取文件失败 - {str(e)}")
+                    return
+                delta_len += n_chars
+                delta_sent += n_sent
+            info.update(ngrams=len(delta), chars=delta_len, sentences=delta_sent)
+
+        with self._stage('merge') as info:
+            self._merge_delta(state, delta)
+            state['total_len'] += delta_len
+            state['n_sent'] += delta_sent
+            info.update(ngrams=state['ngrams'])
+
+        # 2. 受影响的候选词；最小词频变化时在压缩时重新评分全部候选词
+        rescore = state['min_count'] != self.min_count
+        if rescore:
+            print("最小词频已变化，重新评分全部候选词...")
+            state['min_count'] = self.min_count
+            affected = set()
+        else:
+            affected = self._affected(state, delta, max_word_len)
+            print(f"新增 {delta_len} 个汉字，重新评分 {len(affected)} 个候选片段...")
+        with self._stage('score') as info:
+            self._rescore_state(state, affected)
+            info.update(affected=len(affected), candidates=len(state['scores']))
+
+        with self._stage('save_state') as info:
+            try:
+                compacted = self._save_state(state, state_path, delta, affected, max_ngrams,
+                                             rescore)
+            except Exception as e:
+                print(f"保存状态失败: {e}")
+                return
+            info.update(compacted=compacted, journal_bytes=state['journal_size'])
+
+        total_len = state['total_len']
+        if total_len == 0:
+            print("未提取到有效中文内容。")
+            return
+        if state['floor']:
+            print(f"计数表已裁剪，出现次数 <= {state['floor']} 的低频片段可能被低估")
+
+        # 3. 只遍历候选词，按首次出现顺序输出，同频词的先后与一次性统计完全相同
+        print(f"累计分析 {total_len} 个汉字，共 {state['n_sent']} 个语句片段...")
+        results = {}
+        scores = state['scores']
+        known_words = self._known_lookup(len(scores))
+        for word, score in sorted(scores.items(), key=lambda x: x[1][4]):
+            if word in known_words:
+                continue
+            count, c1, c2, entropy, _ = score
+            if c1 > 0:
+                min_pmi = math.log2((count / total_len) / ((c1 / total_len) * (c2 / total_len)))
+            else:
+                min_pmi = float('inf')
+            if self._pmi_ok(min_pmi) and self._entropy_ok(entropy):
+                results[word] = self._record(count, min_pmi, entropy)
+        if self.background:
+            results = self._contrast(results, total_len, top_k)
+        elif top_k:
+            # nlargest 与稳定排序后截断等价，同频词保持出现顺序
+            results = dict(heapq.nlargest(top_k, results.items(), key=lambda x: x[1]['count']))
+        with self._stage('dump') as info:
+            self._save_results(results, output_path, output_format)
+            info.update(results=len(results))
+        self._emit('summary', seconds=round(time.perf_counter() - run_start, 4),
+                   chars=total_len, ngrams=state['ngrams'], results=len(results))
+
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 2:
-        print("用法: python3 word_discovery.py <文件路径(txt/epub)> [输出文件路径]")
-        sys.exit(1)
-    
-    output = sys.argv[2] if len(sys.argv) > 2 else "medical_new_words.json"
-    discovery = NewWordDiscovery('dicts')
-    discovery.extract(sys.argv[1], output)
+    import argparse
+    parser = argparse.ArgumentParser(description="基于 PMI 与左右熵的新词发现")
+    parser.add_argument('file', help="文件路径(txt/epub)")
+    parser.add_argument('output', nargs='?', default="medical_new_words.json",
+                        help="输出文件路径")
+    parser.add_argument('--stream', action='store_true',
+                        help="流式读取与计数，内存占用不随语料增长")
+    parser.add_argument('--max-ngrams', type=int, default=5000000,
+                        help="流式模式下计数表的最大条目数，增量模式下状态的最大片段数")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="统计 N-gram 的进程数 (suffix 后端忽略此项)")
+    parser.add_argument('--backend', choices=['counter', 'suffix'], default='counter',
+                        help="统计后端：counter (默认) 或 suffix (后缀数组，需要 numpy)")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="使用 numpy 批量计算 PMI 与熵")
+    parser.add_argument('--state',
+                        help="增量模式：把文件并入该状态文件，只重新评分受影响的候选词")
+    parser.add_argument('--telemetry',
+                        help="把各阶段耗时、计数与内存采样以 JSON Lines 追加写入该文件")
+    parser.add_argument('--top-k', type=int,
+                        help="只输出词频最高的 K 个新词")
+    parser.add_argument('--format', choices=['json', 'jsonl'],
+                        help="输出格式，默认按输出文件扩展名判断 (.jsonl 为逐行流式输出)")
+    parser.add_argument('--max-word-len', type=int, default=4,
+                        help="新词最大长度")
+    parser.add_argument('--background',
+                        help="背景模型文件：按对数似然比只保留领域语料中显著偏多的新词")
+    parser.add_argument('--build-background', metavar='MODEL',
+                        help="把 file (逗号分隔可给多个) 统计为背景模型写入 MODEL，不做新词发现")
+    parser.add_argument('--min-llr', type=float, default=10.83,
+                        help="对比模式下的最小对数似然比")
+    args = parser.parse_args()
+
+    telemetry = JsonLinesTelemetry(args.telemetry) if args.telemetry else None
+    discovery = NewWordDiscovery('dicts', on_event=telemetry, background=args.background)
+    discovery.min_llr = args.min_llr
+    if args.build_background:
+        discovery.build_background(args.file.split(','), args.build_background,
+                                   max_word_len=args.max_word_len, max_ngrams=args.max_ngrams)
+    elif args.state:
+        discovery.update([args.file], args.state, args.output, max_word_len=args.max_word_len,
+                         top_k=args.top_k, output_format=args.format,
+                         max_ngrams=args.max_ngrams)
+    else:
+        discovery.extract(args.file, args.output, max_word_len=args.max_word_len,
+                          streaming=args.stream, max_ngrams=args.max_ngrams,
+                          jobs=args.jobs, backend=args.backend, vectorized=args.vectorized,
+                          top_k=args.top_k, output_format=args.format)
+    if telemetry:
+        telemetry.close()
@@ -0,0 +1,202 @@
+"""新词发现使用的内存映射表
+
+已知词索引、背景模型与增量发现状态的基表共用同一种文件布局：排序后的
+UTF-8 字符串块加偏移表，打开时只做内存映射，查询时二分查找。
+"""
+import json
+import mmap
+import os
+import pickle
+import struct
+from array import array
+
+# 增量发现状态文件的格式版本
+STATE_VERSION = 2
+
+
+class KnownWordIndex:
+    """已知词索引：排序后的 UTF-8 字符串块加偏移表，内存映射后二分查找
+
+    文件布局 (本机字节序)：
+        magic(4) | version, count, manifest_len (3 x uint32) | manifest JSON
+        | 补齐到 4 字节 | offsets ((count + 1) x uint32) | 值列 (可选)
+        | 字符串块 | 附加数据 (可选)
+    每个值列与键一一对应，按自身元素大小对齐。
+    """
+    MAGIC = b'KWIX'
+    VERSION = 1
+
+    def __init__(self, path):
+        self._path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:4] != self.MAGIC:
+            raise ValueError(f"索引文件类型不符: {path}")
+        if len(self._mm) < 16:
+            raise ValueError(f"索引文件已损坏: {path}")
+        version, self._count, manifest_len = struct.unpack_from('=3I', self._mm, 4)
+        if version != self.VERSION:
+            raise ValueError(f"索引文件版本不兼容: {version}")
+        pos = 16 + manifest_len
+        pos += -pos % 4
+        # 截断或写坏的文件在这里拒绝，避免之后切片越界或解码出错
+        if len(self._mm) < pos + 4 * (self._count + 1):
+            raise ValueError(f"索引文件已损坏: {path}")
+        self.manifest = json.loads(self._mm[16:16 + manifest_len].decode('utf-8'))
+        self._offsets = memoryview(self._mm)[pos:pos + 4 * (self._count + 1)].cast('I')
+        self._base = pos + 4 * (self._count + 1)
+        self._check_size()
+
+    @classmethod
+    def build(cls, path, words, manifest):
+        """把词集合写成索引文件 (先写临时文件再替换)"""
+        cls._write(path, sorted(w.encode('utf-8') for w in words), manifest)
+
+    @classmethod
+    def _write(cls, path, keys, manifest, columns=(), trailer=b''):
+        """写出已排序的键；columns 为与键一一对应的 array 值列，依次写在偏移表之后"""
+        offsets = array('I', [0])
+        for key in keys:
+            offsets.append(offsets[-1] + len(key))
+        manifest_bytes = json.dumps(manifest, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        header = cls.MAGIC + struct.pack('=3I', cls.VERSION, len(keys), len(manifest_bytes))
+        padding = b'\0' * (-(len(header) + len(manifest_bytes)) % 4)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header + manifest_bytes + padding)
+            offsets.tofile(f)
+            for column in columns:
+                f.write(b'\0' * (-f.tell() % column.itemsize))
+                column.tofile(f)
+            f.write(b''.join(keys))
+            f.write(trailer)
+        os.replace(tmp_path, path)
+
+    def _column(self, typecode):
+        """读取 _write 写出的下一个值列，返回 memoryview"""
+        size = array(typecode).itemsize
+        self._base += -self._base % size
+        self._base += size * self._count
+        self._check_size()
+        return memoryview(self._mm)[self._base - size * self._count:self._base].cast(typecode)
+
+    def _check_size(self):
+        """确认文件长度足以容纳 _base 之后的字符串块"""
+        if len(self._mm) < self._base + self._offsets[-1]:
+            self._offsets.release()
+            self._mm.close()
+            raise ValueError(f"索引文件已损坏: {self._path}")
+
+    def _trailer(self):
+        """字符串块之后的附加数据"""
+        return self._mm[self._base + self._offsets[-1]:]
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, word):
+        return self._find(word) >= 0
+
+    def to_set(self):
+        """把全部键读成 set：十几万词只需几十毫秒，大量查询时远快于逐个二分查找"""
+        offsets = self._offsets.tolist()
+        blob = self._mm[self._base:self._base + offsets[-1]]
+        return {blob[a:b].decode('utf-8') for a, b in zip(offsets, offsets[1:])}
+
+    def _find(self, word):
+        """二分查找词的序号，不存在时返回 -1"""
+        key = word.encode('utf-8')
+        mm, offsets, base = self._mm, self._offsets, self._base
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cur = mm[base + offsets[mid]:base + offsets[mid + 1]]
+            if cur < key:
+                lo = mid + 1
+            elif cur > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+
+class BackgroundModel(KnownWordIndex):
+    """背景语料 N-gram 计数表：与已知词索引同样的布局，偏移表后附计数数组
+
+    manifest 记录背景语料清单、汉字总数 (total_len)、最大片段长度
+    (max_word_len)、收录的最小计数 (min_count) 与统计时计数表的裁剪阈值
+    (floor)。未收录的片段在背景语料中最多出现 max(floor, min_count - 1) 次，
+    按这个上界计数 (missing_count)，对比时宁可低估 llr，也不把背景中少量
+    出现过的片段当作从未出现。模型只需用
+    build_background 构建一次，之后每次运行直接内存映射，不再重新统计背景语料。
+    """
+    MAGIC = b'BGNG'
+    VERSION = 1
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._counts = self._column('I')
+        self.total_len = self.manifest['total_len']
+        self.max_word_len = self.manifest['max_word_len']
+        # 旧版模型没有记录裁剪阈值，按未裁剪处理
+        self.floor = self.manifest.get('floor', 0)
+        self.missing_count = max(self.floor, self.manifest.get('min_count', 1) - 1)
+
+    @classmethod
+    def build(cls, path, counts, manifest):
+        """把 {片段: 计数} 写成模型文件"""
+        items = sorted((w.encode('utf-8'), min(c, 0xFFFFFFFF)) for w, c in counts.items())
+        cls._write(path, [k for k, _ in items], manifest, [array('I', [c for _, c in items])])
+
+    def count(self, word):
+        """片段在背景语料中的计数；未收录的片段低于 min_count 或已被裁剪，按 missing_count 计"""
+        i = self._find(word)
+        return self._counts[i] if i >= 0 else self.missing_count
+
+
+class StateTable(KnownWordIndex):
+    """增量发现状态的基表：全部 N-gram 的计数、首次出现序号与左右邻字累加器
+
+    与已知词索引同样的布局，偏移表后附 COLUMNS 所列的 6 个值列，字符串块
+    之后是候选词评分、单字计数与切分部分反向索引的 pickle。manifest 记录
+    max_word_len、min_count、汉字总数与世代号。基表只在压缩时整体重写，
+    两次压缩之间的更新追加写入日志文件 (见 NewWordDiscovery.update)。
+    """
+    MAGIC = b'WDST'
+    VERSION = STATE_VERSION
+    # 每个片段一条 [count, seq, 右邻 sum c, 右邻 sum c*log2(c), 左邻 sum c, 左邻 sum c*log2(c)]
+    COLUMNS = 'qqqdqd'
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._columns = [self._column(t) for t in self.COLUMNS]
+
+    @classmethod
+    def build(cls, path, entries, manifest, extra):
+        """把 {片段: 条目} 写成基表，extra 写在字符串块之后"""
+        items = sorted((w.encode('utf-8'), e) for w, e in entries.items())
+        columns = [array(t, [e[i] for _, e in items]) for i, t in enumerate(cls.COLUMNS)]
+        cls._write(path, [k for k, _ in items], manifest, columns,
+                   pickle.dumps(extra, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def entry(self, word):
+        """返回片段的条目 (新列表)，不存在时返回 None"""
+        i = self._find(word)
+        return [column[i] for column in self._columns] if i >= 0 else None
+
+    def items(self):
+        """按键序产出全部 (片段, 条目)"""
+        offsets = self._offsets.tolist()
+        blob = self._mm[self._base:self._base + offsets[-1]]
+        words = (blob[a:b].decode('utf-8') for a, b in zip(offsets, offsets[1:]))
+        return zip(words, map(list, zip(*(column.tolist() for column in self._columns))))
+
+    def extra(self):
+        return pickle.loads(self._trailer())
+
+    def close(self):
+        """释放内存映射；压缩时需要先关闭才能在 Windows 上替换文件"""
+        for view in self._columns + [self._offsets]:
+            view.release()
+        self._mm.close()